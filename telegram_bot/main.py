@@ -5,19 +5,21 @@ Author: Pepetopia Dev Team
 Version: 1.3.0 (Global Edition + Persistence)
 """
 
+import asyncio
 import logging
+import re
 import sys
 import os
 import time
+import aiohttp
 
 # --- PATH CONFIGURATION ---
-# Ensures Python can find the 'src' directory regardless of execution context.
+# Ensures Python can find the 'src' package regardless of execution context.
+# All imports are 'src.'-qualified, so only the project root is needed;
+# 'src' itself is not added (it would lengthen every import lookup and let
+# 'core'/'services'/'handlers' shadow installed packages).
 current_dir = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(current_dir, "src")
 
-# Add paths to system
-if src_dir not in sys.path:
-    sys.path.insert(0, src_dir)
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
@@ -29,26 +31,48 @@ try:
     # 2. Handlers
     from src.handlers.basic import start_command, help_command, ca_command, socials_command
     from src.handlers.crypto import price_command
-    from src.handlers.ai_chat import ai_chat_handler
+    from src.handlers.ai_chat import ai_chat_handler, AI_TRIGGER
     # Updated Imports for Persistence
     from src.handlers.scheduled_tasks import (
         start_schedule_command, 
         stop_schedule_command, 
         instant_news_command, 
-        schedule_all_jobs  # Required for auto-start
+        schedule_all_jobs,  # Required for auto-start
+        load_sent_links,
+        restore_subscriptions
     )
-    from src.handlers.security import welcome_new_member, verify_callback
-    from src.handlers.moderation import moderation_handler, lockdown_command, unlock_command
+    from src.handlers.security import (
+        welcome_new_member,
+        verify_callback,
+        PrefixCallbackQueryHandler,
+        VERIFY_PREFIX
+    )
+    from src.handlers.moderation import (
+        moderation_handler,
+        admin_change_handler,
+        lockdown_command,
+        unlock_command
+    )
+
+    # 3. Restart-safe State
+    from src.core.state_store import StateStore
+    from src.services.admin_service import AdminService
+    from src.core.rate_limiter import SendRateLimiter
+
+    # 4. AI Service
+    from src.services.gemini_service import GeminiService
 
 except ImportError as e:
     print(f"🔥 CRITICAL IMPORT ERROR: {e}")
     raise e
 
+from telegram import Update
 from telegram.ext import (
     ApplicationBuilder, 
+    ChatMemberHandler,
     CommandHandler, 
     MessageHandler, 
-    CallbackQueryHandler, 
+    ContextTypes,
     filters
 )
 
@@ -59,18 +83,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# --- POLLING CONFIGURATION ---
+# Only request the update types we actually handle. Telegram filters the rest
+# server-side, so edits, channel posts, polls etc. are never downloaded.
+# (NEW_CHAT_MEMBERS is delivered as a regular 'message' update;
+#  'chat_member' keeps the admin cache in sync with promotions/demotions.)
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY, Update.CHAT_MEMBER]
+
+# --- SHARED FILTERS ---
+# Built once and reused by every text pipeline (Moderation & AI).
+TEXT_NON_COMMAND = filters.TEXT & ~filters.COMMAND
+
+# --- COMMAND TABLE ---
+# (command name(s), callback). Aliases share one handler.
+COMMANDS = (
+    # 1. Basic & Info Commands
+    ("start", start_command),
+    ("help", help_command),
+    (("socials", "website"), socials_command),
+    (("ca", "contract"), ca_command),
+
+    # 2. Market & News Commands
+    ("price", price_command),
+    (("digest", "flash_news"), instant_news_command),
+
+    # 3. Admin & Automation Commands
+    ("lockdown", lockdown_command),
+    ("unlock", unlock_command),
+    ("autopilot_on", start_schedule_command),
+    ("autopilot_off", stop_schedule_command),
+)
+
+# Max number of updates processed at the same time.
+CONCURRENT_UPDATES = 256
+
+# --- OUTBOUND RATE LIMITS ---
+# Telegram caps bots at ~30 msg/s overall and ~20 msg/min per group.
+# Stay slightly below so bursts are queued instead of hitting RetryAfter.
+# Only sends/edits are paced: deletes, mutes and lookups (moderation,
+# CAPTCHA) never wait for the per-group message budget.
+RATE_LIMITER = SendRateLimiter(
+    overall_max_rate=28,
+    overall_time_period=1,
+    group_max_rate=18,
+    group_time_period=60,
+    max_retries=3
+)
+
+# --- BOT API CONNECTION POOLS ---
+# Long polling gets its own small pool, so a burst of outgoing replies can never
+# starve getUpdates (and vice versa). Outbound calls share a bigger pool.
+BOT_API_POOL_SIZE = 64
+BOT_API_POOL_TIMEOUT = 30
+GET_UPDATES_POOL_SIZE = 4
+GET_UPDATES_POOL_TIMEOUT = 30
+
+# --- OUTBOUND HTTP (shared session) ---
+HTTP_MAX_CONNECTIONS = 100
+HTTP_TIMEOUT = 30
+HTTP_CONNECT_TIMEOUT = 5
+
 async def post_init(application):
     """
     Runs automatically after the bot starts.
-    Restores the 'Autopilot' schedule for the main chat defined in .env.
+    Restores the 'Autopilot' schedule for saved subscribers and for the
+    main chat defined in .env.
     """
+    # Cache the bot identity once (get_me already ran during initialize),
+    # so the AI handler doesn't rebuild the mention string on every message.
+    # Word boundary: '@Pepetopia_BotFake' is not a mention of '@Pepetopia_Bot'.
+    mention_re = re.compile(rf"@{re.escape(application.bot.username)}\b", re.IGNORECASE)
+    application.bot_data["mention_re"] = mention_re
+    AI_TRIGGER.set_identity(application.bot.id, mention_re)
+
+    # Restart-safe state (admin lists, sent news links, Autopilot subscribers)
+    StateStore.open(Config.STATE_DB_PATH)
+    AdminService.load_cache()
+    load_sent_links()
+    restore_subscriptions(application.job_queue)
+
+    # Shared HTTP session for outbound API calls (connection reuse, no per-call TLS handshake)
+    application.bot_data["http"] = aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        connector=aiohttp.TCPConnector(limit=HTTP_MAX_CONNECTIONS)
+    )
+
+    # Gemini model discovery in the background (startup doesn't wait for it)
+    application.create_task(GeminiService.ensure_initialized(), name="gemini_discovery")
+
     main_chat_id = Config.MAIN_CHAT_ID
     
     if main_chat_id:
         try:
             # Ensure chat_id is an integer
             chat_id_int = int(main_chat_id)
-            logger.info(f"🔄 Auto-Starting Autopilot for Main Chat ID: {chat_id_int}")
+            logger.info("🔄 Auto-Starting Autopilot for Main Chat ID: %s", chat_id_int)
             
             # Restore the schedule (Istanbul Time)
             schedule_all_jobs(application.job_queue, chat_id_int)
@@ -79,73 +186,100 @@ async def post_init(application):
             # await application.bot.send_message(chat_id=chat_id_int, text="🐸 TOPI is Online! Systems Active.")
             
         except Exception as e:
-            logger.error(f"❌ Failed to auto-start autopilot: {e}")
+            logger.error("❌ Failed to auto-start autopilot: %s", e)
     else:
         logger.warning("⚠️ MAIN_CHAT_ID not set in .env. Autopilot won't start automatically.")
 
+async def post_shutdown(application):
+    """
+    Runs automatically after the bot stops.
+    Closes the shared HTTP session and the state store.
+    """
+    session = application.bot_data.pop("http", None)
+    if session:
+        await session.close()
+    StateStore.close()
+
+async def on_error(update: object, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Global error handler. PTB routes exceptions from any handler or job here,
+    so one failing update is logged without touching the others.
+    """
+    logger.error("🔥 Unhandled error while processing update: %s", update, exc_info=context.error)
+
 def main():
     """
     Main execution function. Initializes the bot and starts polling.
     """
+    logger.info("🚀 Initializing Pepetopia Bot (TOPI) - Global Edition...")
+    
+    # --- ZOMBIE KILLER PROTOCOL ---
+    # Wait 5 seconds to ensure any previous instance is terminated on the server.
+    logger.info("⏳ Waiting 5s for previous instance to terminate...")
+    time.sleep(5)
+
+    # --- EVENT LOOP ---
+    # uvloop (libuv, C) is a faster drop-in asyncio loop. Optional: not available on Windows.
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("⚡ uvloop event loop enabled.")
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop.")
+
+    # Validate Configuration
     try:
-        logger.info("🚀 Initializing Pepetopia Bot (TOPI) - Global Edition...")
-        
-        # --- ZOMBIE KILLER PROTOCOL ---
-        # Wait 5 seconds to ensure any previous instance is terminated on the server.
-        logger.info("⏳ Waiting 5s for previous instance to terminate...")
-        time.sleep(5)
-
-        # Validate Configuration
-        if not Config.TELEGRAM_TOKEN:
-            logger.critical("❌ TELEGRAM_TOKEN is missing! Check Environment Variables.")
-            return
-
-        # Build Application with Post-Init Hook
-        application = (
-            ApplicationBuilder()
-            .token(Config.TELEGRAM_TOKEN)
-            .post_init(post_init) # <--- THIS ENABLES PERSISTENCE
-            .build()
-        )
-        
-        # --- REGISTER HANDLERS ---
-        
-        # 1. Basic & Info Commands
-        application.add_handler(CommandHandler("start", start_command))
-        application.add_handler(CommandHandler("help", help_command))
-        application.add_handler(CommandHandler("socials", socials_command))
-        application.add_handler(CommandHandler("website", socials_command))
-        application.add_handler(CommandHandler("ca", ca_command))
-        application.add_handler(CommandHandler("contract", ca_command)) 
-        
-        # 2. Market & News Commands
-        application.add_handler(CommandHandler("price", price_command))
-        application.add_handler(CommandHandler("digest", instant_news_command))
-        application.add_handler(CommandHandler("flash_news", instant_news_command))
-        
-        # 3. Admin & Automation Commands
-        application.add_handler(CommandHandler("lockdown", lockdown_command))
-        application.add_handler(CommandHandler("unlock", unlock_command))
-        application.add_handler(CommandHandler("autopilot_on", start_schedule_command))
-        application.add_handler(CommandHandler("autopilot_off", stop_schedule_command))
-        
-        # 4. Security (Gatekeeper)
-        application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, welcome_new_member))
-        application.add_handler(CallbackQueryHandler(verify_callback, pattern="^verify_"))
-        
-        # 5. Message Processing (Moderation & AI)
-        # Group 1: Moderation (Runs first)
-        application.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), moderation_handler), group=1)
-        # Group 2: AI Chat (Runs if not stopped)
-        application.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), ai_chat_handler), group=2)
-
-        logger.info("✅ Bot is ready and polling...")
-        
-        # Start Polling
-        application.run_polling()
-        
-    except Exception as e:
-        logger.critical(f"🔥 Critical System Failure: {e}")
+        Config.validate()
+    except ValueError as e:
+        logger.critical("❌ %s Check Environment Variables.", e)
+        return
+
+    # Build Application with Post-Init Hook
+    # concurrent_updates: updates from different chats are processed in
+    # parallel instead of queueing behind one slow network call.
+    # Unused features are switched off explicitly: no callback-data cache
+    # (our callback_data are plain strings) and no per-update persistence.
+    application = (
+        ApplicationBuilder()
+        .token(Config.TELEGRAM_TOKEN)
+        .arbitrary_callback_data(False)
+        .persistence(None)
+        .concurrent_updates(CONCURRENT_UPDATES)
+        .rate_limiter(RATE_LIMITER)
+        .connection_pool_size(BOT_API_POOL_SIZE)
+        .pool_timeout(BOT_API_POOL_TIMEOUT)
+        .get_updates_connection_pool_size(GET_UPDATES_POOL_SIZE)
+        .get_updates_pool_timeout(GET_UPDATES_POOL_TIMEOUT)
+        .post_init(post_init) # <--- THIS ENABLES PERSISTENCE
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    
+    # --- REGISTER HANDLERS ---
+    
+    # 1-3. Commands (Basic & Info, Market & News, Admin & Automation)
+    for commands, callback in COMMANDS:
+        application.add_handler(CommandHandler(commands, callback, block=False))
+    
+    # 4. Security (Gatekeeper)
+    application.add_handler(MessageHandler(filters.StatusUpdate.NEW_CHAT_MEMBERS, welcome_new_member))
+    application.add_handler(PrefixCallbackQueryHandler(verify_callback, VERIFY_PREFIX))
+    
+    application.add_handler(ChatMemberHandler(admin_change_handler, ChatMemberHandler.CHAT_MEMBER))
+    
+    # 5. Message Processing (Moderation & AI)
+    # Group 1: Moderation (Runs first, blocking so it can stop propagation; groups only)
+    application.add_handler(MessageHandler(TEXT_NON_COMMAND & filters.ChatType.GROUPS, moderation_handler), group=1)
+    # Group 2: AI Chat (Runs if not stopped and the bot is addressed, as a background task)
+    application.add_handler(MessageHandler(TEXT_NON_COMMAND & AI_TRIGGER, ai_chat_handler, block=False), group=2)
+
+    # 6. Error Reporting
+    application.add_error_handler(on_error)
+
+    logger.info("✅ Bot is ready and polling...")
+    
+    # Start Polling
+    application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,10 @@
 import os
+import logging
 from pathlib import Path
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # --- ABSOLUTE PATH FIX ---
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -23,21 +26,20 @@ class Config:
     # --- NEW: Added for Persistence ---
     MAIN_CHAT_ID = os.getenv("MAIN_CHAT_ID")
 
+    # Restart-safe caches (SQLite, see src/core/state_store.py)
+    STATE_DB_PATH = os.getenv("STATE_DB_PATH", str(BASE_DIR / "bot_state.sqlite3"))
+
     @staticmethod
     def validate():
-        
-        print(f"--- DEBUG INFO ---")
-        print(f"Looking for .env at: {ENV_PATH}")
-        print(f"File exists?: {ENV_PATH.exists()}")
-        print(f"TRADING_SYMBOL Value: '{Config.TRADING_SYMBOL}'")
-        # Debugging the new variable
-        print(f"MAIN_CHAT_ID Value: '{Config.MAIN_CHAT_ID}'") 
-        print(f"------------------")
+        """
+        Checks required settings. Called once from main() at startup
+        (not on import), diagnostics go through logging.
+        """
+        logger.debug("Looking for .env at: %s (exists: %s)", ENV_PATH, ENV_PATH.exists())
+        logger.debug("TRADING_SYMBOL Value: '%s'", Config.TRADING_SYMBOL)
+        logger.debug("MAIN_CHAT_ID Value: '%s'", Config.MAIN_CHAT_ID)
 
         if not Config.TELEGRAM_TOKEN:
             raise ValueError("Error: TELEGRAM_TOKEN is missing.")
         if not Config.GEMINI_API_KEY:
             raise ValueError("Error: GEMINI_API_KEY is missing.")
-
-# Run validation on import
-Config.validate()
\ No newline at end of file
@@ -0,0 +1,20 @@
+from telegram.ext import AIORateLimiter
+
+class SendRateLimiter(AIORateLimiter):
+    """
+    AIORateLimiter that only paces message-producing calls.
+
+    The stock limiter charges EVERY request with a group chat_id against the
+    per-group budget (~20/min), including deletes, mutes, admin lookups and
+    chat actions. During a raid that halves the moderation throughput.
+    Here only sends/edits/copies/forwards go through the limiter; enforcement
+    and lookups run straight away.
+    """
+
+    THROTTLED_PREFIXES = ("send", "edit", "copy", "forward")
+    UNTHROTTLED_ENDPOINTS = frozenset({"sendChatAction"})
+
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        if endpoint.startswith(self.THROTTLED_PREFIXES) and endpoint not in self.UNTHROTTLED_ENDPOINTS:
+            return await super().process_request(callback, args, kwargs, endpoint, data, rate_limit_args)
+        return await callback(*args, **kwargs)
@@ -0,0 +1,120 @@
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+class StateStore:
+    """
+    Small SQLite store (WAL mode) for state that should survive a restart:
+    - admin_cache: cached admin lists per chat (see AdminService)
+    - news_sent:   recently published news links per chat (see scheduled_tasks)
+    - subscriptions: chats with Autopilot enabled (see scheduled_tasks)
+
+    Reads happen once at startup, writes go through as the caches change.
+    Every method is a no-op until `open()` was called, so the caches also
+    work purely in memory.
+    """
+
+    _conn = None
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS admin_cache ("
+        "chat_id INTEGER PRIMARY KEY, admin_ids TEXT NOT NULL, expires REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS news_sent ("
+        "chat_id INTEGER NOT NULL, link TEXT NOT NULL, ts REAL NOT NULL, PRIMARY KEY (chat_id, link))",
+        "CREATE TABLE IF NOT EXISTS subscriptions (chat_id INTEGER PRIMARY KEY)",
+    )
+
+    @classmethod
+    def open(cls, path: str):
+        """Opens (or creates) the database. Autocommit, WAL journal."""
+        if cls._conn is not None:
+            return
+        conn = sqlite3.connect(path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in cls.SCHEMA:
+            conn.execute(statement)
+        cls._conn = conn
+        logger.info("State store opened: %s", path)
+
+    @classmethod
+    def close(cls):
+        if cls._conn is not None:
+            cls._conn.close()
+            cls._conn = None
+
+    # --- ADMIN CACHE ---
+    @classmethod
+    def load_admin_cache(cls) -> dict:
+        """Returns {chat_id: (frozenset(admin_ids), expires_at)} for entries still valid."""
+        if cls._conn is None:
+            return {}
+        rows = cls._conn.execute(
+            "SELECT chat_id, admin_ids, expires FROM admin_cache WHERE expires > ?", (time.time(),)
+        )
+        return {
+            chat_id: (frozenset(int(uid) for uid in admin_ids.split(",") if uid), expires)
+            for chat_id, admin_ids, expires in rows
+        }
+
+    @classmethod
+    def save_admin_ids(cls, chat_id: int, admin_ids: frozenset, expires: float):
+        if cls._conn is None:
+            return
+        cls._conn.execute(
+            "INSERT OR REPLACE INTO admin_cache (chat_id, admin_ids, expires) VALUES (?, ?, ?)",
+            (chat_id, ",".join(map(str, admin_ids)), expires)
+        )
+
+    @classmethod
+    def delete_admin_ids(cls, chat_id: int):
+        if cls._conn is None:
+            return
+        cls._conn.execute("DELETE FROM admin_cache WHERE chat_id = ?", (chat_id,))
+
+    # --- SENT NEWS ---
+    @classmethod
+    def load_sent_links(cls) -> dict:
+        """Returns {chat_id: [link, ...]} ordered from oldest to newest."""
+        if cls._conn is None:
+            return {}
+        sent = {}
+        for chat_id, link in cls._conn.execute("SELECT chat_id, link FROM news_sent ORDER BY ts"):
+            sent.setdefault(chat_id, []).append(link)
+        return sent
+
+    @classmethod
+    def add_sent_link(cls, chat_id: int, link: str, keep: int):
+        """Records a published link and keeps only the newest `keep` per chat."""
+        if cls._conn is None:
+            return
+        cls._conn.execute(
+            "INSERT OR REPLACE INTO news_sent (chat_id, link, ts) VALUES (?, ?, ?)",
+            (chat_id, link, time.time())
+        )
+        cls._conn.execute(
+            "DELETE FROM news_sent WHERE chat_id = ? AND link NOT IN "
+            "(SELECT link FROM news_sent WHERE chat_id = ? ORDER BY ts DESC LIMIT ?)",
+            (chat_id, chat_id, keep)
+        )
+
+    # --- AUTOPILOT SUBSCRIPTIONS ---
+    @classmethod
+    def load_subscriptions(cls) -> list:
+        if cls._conn is None:
+            return []
+        return [chat_id for (chat_id,) in cls._conn.execute("SELECT chat_id FROM subscriptions")]
+
+    @classmethod
+    def add_subscription(cls, chat_id: int):
+        if cls._conn is None:
+            return
+        cls._conn.execute("INSERT OR IGNORE INTO subscriptions (chat_id) VALUES (?)", (chat_id,))
+
+    @classmethod
+    def remove_subscription(cls, chat_id: int):
+        if cls._conn is None:
+            return
+        cls._conn.execute("DELETE FROM subscriptions WHERE chat_id = ?", (chat_id,))
@@ -0,0 +1,130 @@
+import asyncio
+import contextlib
+import logging
+import re
+import time
+from telegram import Update, Message
+from telegram.constants import ChatAction, ChatType
+from telegram.ext import ContextTypes, filters
+from src.services.gemini_service import GeminiService
+
+# Initialize Logger
+logger = logging.getLogger(__name__)
+
+class AITriggerFilter(filters.MessageFilter):
+    """
+    Passes only messages that address the bot:
+    1. Private chat (DM).
+    2. Mention (@BotName) in a group.
+    3. Reply to one of the bot's messages.
+
+    Evaluated synchronously by the dispatcher, so regular group chatter never
+    schedules the AI handler at all. The bot identity is only known after
+    startup and is injected via `set_identity` (see post_init in main.py).
+    """
+    __slots__ = ("mention_re", "bot_id")
+
+    def __init__(self):
+        super().__init__(name="AITriggerFilter")
+        self.mention_re = None
+        self.bot_id = None
+
+    def set_identity(self, bot_id: int, mention_re: re.Pattern):
+        self.bot_id = bot_id
+        self.mention_re = mention_re
+
+    def filter(self, message: Message) -> bool:
+        if message.chat.type == ChatType.PRIVATE:
+            return True
+        if self.mention_re is None:
+            return False
+        if message.text and self.mention_re.search(message.text):
+            return True
+        reply = message.reply_to_message
+        return bool(reply and reply.from_user and reply.from_user.id == self.bot_id)
+
+# Shared instance registered in main.py
+AI_TRIGGER = AITriggerFilter()
+
+# Telegram shows 'typing...' for ~5s, refresh slightly before it expires.
+# Private chats only: groups get a single action, so a slow reply doesn't
+# spend the per-group request budget moderation and CAPTCHA rely on.
+TYPING_REFRESH_SECONDS = 4
+
+# Streamed replies (private chats only): the message is edited at most once
+# per interval, the final text always lands. Groups get one finished reply,
+# so AI edits never eat the per-group rate budget (see RATE_LIMITER in main.py)
+# that moderation and CAPTCHA messages depend on.
+STREAM_EDIT_INTERVAL = 1.0  # Seconds
+
+async def _keep_typing(bot, chat_id: int, refresh: bool):
+    """Sends the 'typing' chat action (repeated until cancelled if `refresh`)."""
+    while True:
+        try:
+            await bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
+        except Exception as e:
+            logger.warning("Chat action failed: %s", e)
+            return
+        if not refresh:
+            return
+        await asyncio.sleep(TYPING_REFRESH_SECONDS)
+
+async def ai_chat_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    [Event: Text Message]
+    Routes a message to the TOPI persona (Gemini).
+    Only reached for DMs, mentions and replies to the bot (see AI_TRIGGER).
+    """
+    user_text = update.message.text
+    chat_type = update.effective_chat.type
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("AI Triggered by User: %s in %s", update.effective_user.id, chat_type)
+
+    # Show 'typing...' in the background while Gemini is already working
+    typing_task = asyncio.create_task(
+        _keep_typing(context.bot, update.effective_chat.id, refresh=chat_type == ChatType.PRIVATE)
+    )
+    try:
+        # Mention pattern is compiled once at startup (see post_init in main.py)
+        cleaned_text = context.bot_data["mention_re"].sub("", user_text).strip()
+
+        if chat_type != ChatType.PRIVATE:
+            ai_response = await GeminiService.get_response(cleaned_text)
+            typing_task.cancel()
+            await update.message.reply_text(ai_response)
+            return
+
+        await _stream_reply(update, cleaned_text, typing_task)
+    finally:
+        typing_task.cancel()
+
+async def _stream_reply(update: Update, cleaned_text: str, typing_task: asyncio.Task):
+    """
+    Private chats: the reply appears with the first streamed chunk and grows in place.
+    aclosing() ends the stream (and frees its Gemini slot) as soon as we stop,
+    even if a Telegram call fails halfway.
+    """
+    reply = None
+    shown = text = ""
+    last_edit = 0.0
+    async with contextlib.aclosing(GeminiService.stream_response(cleaned_text)) as stream:
+        async for text in stream:
+            if reply is None:
+                typing_task.cancel()
+                reply = await update.message.reply_text(text)
+                shown, last_edit = text, time.monotonic()
+            elif time.monotonic() - last_edit >= STREAM_EDIT_INTERVAL:
+                shown, last_edit = await _edit_reply(reply, text, shown), time.monotonic()
+
+    if reply is not None and text != shown:
+        await _edit_reply(reply, text, shown)
+
+async def _edit_reply(reply: Message, text: str, shown: str) -> str:
+    """Updates a streamed reply. Returns the text now on screen."""
+    try:
+        await reply.edit_text(text)
+        return text
+    except Exception as e:
+        logger.warning("Streamed reply edit failed: %s", e)
+        return shown
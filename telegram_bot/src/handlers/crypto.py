@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import time
 from telegram import Update
 from telegram.ext import ContextTypes
 from src.services.price_service import PriceService
@@ -6,6 +8,46 @@ from src.core.app_config import Config
 
 logger = logging.getLogger(__name__)
 
+# --- PRICE MESSAGE ---
+# Filled from the PriceService ticker dict (+ 'trend' emoji).
+PRICE_TEMPLATE = (
+    "🐸 **{name} (AscendEX)**\n\n"
+    "💰 **Price:** ${priceUsd:.8f}\n"
+    "{trend} **24h Change:** {changePercent:.2f}%\n\n"
+    "📊 **24h Volume:** {volume:,.2f}\n"
+    "📈 **24h High:** ${high:.8f}\n"
+    "📉 **24h Low:** ${low:.8f}\n\n"
+    "🔗 [Trade on AscendEX]({url})"
+)
+
+# --- PRICE CACHE (single-flight) ---
+# Concurrent /price calls share one AscendEX request, and the result is
+# reused for a few seconds. Failed fetches (None) are not cached.
+PRICE_CACHE_TTL = 5  # Seconds
+_price_cache = {"data": None, "ts": 0.0, "inflight": None}
+_price_lock = asyncio.Lock()
+
+async def _get_price_data(session, symbol: str):
+    """Returns fresh ticker data, joining an in-flight fetch if there is one."""
+    async with _price_lock:
+        if _price_cache["data"] and time.monotonic() - _price_cache["ts"] < PRICE_CACHE_TTL:
+            return _price_cache["data"]
+        inflight = _price_cache["inflight"]
+        if inflight is None:
+            inflight = asyncio.ensure_future(PriceService.get_token_info(session, symbol))
+            _price_cache["inflight"] = inflight
+
+    try:
+        data = await asyncio.shield(inflight)
+    finally:
+        if _price_cache["inflight"] is inflight and inflight.done():
+            _price_cache["inflight"] = None
+
+    if data and _price_cache["data"] is not data:
+        _price_cache["data"] = data
+        _price_cache["ts"] = time.monotonic()
+    return data
+
 async def price_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     [Command: /price]
@@ -22,30 +64,12 @@ async def price_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     # Fetch Data
-    data = await PriceService.get_token_info(symbol)
+    data = await _get_price_data(context.bot_data["http"], symbol)
     
     if data:
-        # Data Parsing
-        name = data['name']
-        price = data['priceUsd']
-        change_pct = data['changePercent']
-        vol = data['volume']
-        high = data['high']
-        low = data['low']
-        
-        # Determine Trend Emoji
-        trend_emoji = "🚀" if change_pct >= 0 else "🔻"
-        
-        # Build Message
-        message = (
-            f"🐸 **{name} (AscendEX)**\n\n"
-            f"💰 **Price:** ${price:.8f}\n"
-            f"{trend_emoji} **24h Change:** {change_pct:.2f}%\n\n"
-            f"📊 **24h Volume:** {vol:,.2f}\n"
-            f"📈 **24h High:** ${high:.8f}\n"
-            f"📉 **24h Low:** ${low:.8f}\n\n"
-            f"🔗 [Trade on AscendEX]({data['url']})"
-        )
+        # Determine Trend Emoji + Build Message (template is parsed once, at import)
+        trend = "🚀" if data['changePercent'] >= 0 else "🔻"
+        message = PRICE_TEMPLATE.format_map({**data, "trend": trend})
         
         await update.message.reply_text(message, parse_mode='Markdown', disable_web_page_preview=True)
     else:
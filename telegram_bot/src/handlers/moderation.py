@@ -1,7 +1,13 @@
+import asyncio
 import logging
+import re
 import time
-from telegram import Update, ChatPermissions
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+from telegram import Update, ChatMember, ChatPermissions, MessageEntity
 from telegram.ext import ContextTypes, ApplicationHandlerStop
+from src.services.admin_service import AdminService, admin_only
+from src.handlers.security import RESTRICTED_PERMISSIONS, VERIFIED_PERMISSIONS
 
 logger = logging.getLogger(__name__)
 
@@ -13,133 +19,233 @@ BAD_WORDS = [
     "doubler", "risk free", "guaranteed"
 ]
 
+# All bad words folded into one pattern: a single C-level scan per message
+# instead of one substring search per word. Leading word boundary only:
+# 'rug' doesn't fire inside 'drug', but 'scammer', 'rugpull', 'airdrops' still do.
+# Phrases match with spaces or hyphens ('risk free' / 'risk-free').
+BAD_WORDS_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(word).replace(r"\ ", r"[\s-]+") for word in BAD_WORDS) + ")",
+    re.IGNORECASE
+)
+
 WHITELIST_DOMAINS = [
     "pepetopia.com", "x.com", "twitter.com", 
     "t.me", "telegram.me", "coingecko.com", "dexscreener.com"
 ]
 
+# Matched against the host of each URL (exact domain or a subdomain of it).
+WHITELIST_HOSTS = frozenset(WHITELIST_DOMAINS)
+WHITELIST_SUFFIXES = tuple("." + domain for domain in WHITELIST_DOMAINS)
+
 # --- SPAM (FLOOD) SETTINGS ---
 # Stricter rules: 5 messages in 10 seconds = MUTE.
 FLOOD_LIMIT = 5       
 FLOOD_WINDOW = 10     
 MUTE_DURATION = 300   # 5 Minutes Mute
 
-# Flood storage: {user_id: [timestamp1, timestamp2]}
-user_flood_log = {}
-
-# Muted Permissions
-RESTRICTED_PERMISSIONS = ChatPermissions(
-    can_send_messages=False,
-    can_send_audios=False,
-    can_send_documents=False,
-    can_send_photos=False,
-    can_send_videos=False,
-    can_send_other_messages=False,
-    can_add_web_page_previews=False
-)
+# Flood storage: {user_id: deque([timestamp1, timestamp2])}
+# Only the last FLOOD_LIMIT + 1 timestamps matter, older ones fall off.
+user_flood_log = defaultdict(lambda: deque(maxlen=FLOOD_LIMIT + 1))
+
+# Inactive users are swept once the log grows past this size
+# (at most once per FLOOD_WINDOW, so the sweep cost stays amortized).
+FLOOD_LOG_MAX_USERS = 10_000
+_last_flood_sweep = 0.0
+
+# Member statuses that grant admin immunity
+ADMIN_STATUSES = (ChatMember.OWNER, ChatMember.ADMINISTRATOR)
+
+# Verdicts of the local checks
+FLOOD = "flood"
+VIOLATION = "violation"
+
+# --- PERMISSIONS ---
+# Shared with the Gatekeeper (security.py): one definition per permission set.
+# Muted users and a locked-down chat get the same "no content" rules,
+# /unlock restores the same rights a verified member gets.
+LOCKDOWN_PERMISSIONS = RESTRICTED_PERMISSIONS
+UNLOCK_PERMISSIONS = VERIFIED_PERMISSIONS
+
+def is_whitelisted_url(url: str) -> bool:
+    """True if the URL points to a whitelisted domain (or one of its subdomains)."""
+    # Plain URL entities may come without a scheme ("t.me/x"), urlsplit needs one.
+    if "://" not in url:
+        url = "http://" + url
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return False
+    host = host.removeprefix("www.")
+    return host in WHITELIST_HOSTS or host.endswith(WHITELIST_SUFFIXES)
+
+async def _run_actions(failure_note, *actions):
+    """
+    Runs independent Telegram API calls concurrently (one round-trip of
+    latency instead of one per call) and logs any that failed.
+    """
+    results = await asyncio.gather(*actions, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"{failure_note}: {result}")
+
+def _evict_stale_flood_entries(cutoff):
+    """Removes users without any message inside the flood window."""
+    stale = [uid for uid, timestamps in user_flood_log.items() if not timestamps or timestamps[-1] <= cutoff]
+    for uid in stale:
+        del user_flood_log[uid]
 
-async def check_flood(user_id):
+def check_flood(user_id):
     """Checks message rate limit for a user."""
+    global _last_flood_sweep
     current_time = time.time()
-    if user_id not in user_flood_log:
-        user_flood_log[user_id] = []
+    timestamps = user_flood_log[user_id]
     
-    # Keep timestamps within the window
-    user_flood_log[user_id] = [t for t in user_flood_log[user_id] if t > current_time - FLOOD_WINDOW]
-    user_flood_log[user_id].append(current_time)
+    # Drop timestamps outside the window (oldest first)
+    cutoff = current_time - FLOOD_WINDOW
+    while timestamps and timestamps[0] <= cutoff:
+        timestamps.popleft()
+    timestamps.append(current_time)
+
+    # Keep memory bounded to recently active users
+    if len(user_flood_log) > FLOOD_LOG_MAX_USERS and current_time - _last_flood_sweep > FLOOD_WINDOW:
+        _last_flood_sweep = current_time
+        _evict_stale_flood_entries(cutoff)
     
-    return len(user_flood_log[user_id]) > FLOOD_LIMIT
+    return len(timestamps) > FLOOD_LIMIT
+
+async def _is_immune(context: ContextTypes.DEFAULT_TYPE, chat_id: int, user_id: int) -> bool:
+    """Admin immunity (cached, see AdminService). Lookup failures count as 'not admin'."""
+    try:
+        return await AdminService.is_admin(context.bot, chat_id, user_id)
+    except Exception:
+        return False
 
 async def moderation_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Main Moderation Pipeline:
-    1. Admin Immunity Check
-    2. Flood/Spam Check
-    3. Link & Bad Word Analysis
+    1. Flood/Spam Check
+    2. Link & Bad Word Analysis
+    3. Admin Immunity Check (only when something was flagged)
+
+    Steps 1-2 are purely local, so ordinary messages never cost an API call.
+    They run without any await, so verdicts within one chat follow message
+    order without a lock. Enforcement (delete/mute/warning) runs as a
+    background task: a spam wave in one chat never holds up the later
+    messages of that chat, or the update slots other chats need.
+    Only group text messages reach this handler (see its filter in main.py).
     """
-    if not update.message or not update.message.text:
-        return
+    verdict = _local_verdict(update)
+    if verdict is None:
+        return # Clean message, no admin lookup needed
 
     user = update.message.from_user
     chat = update.effective_chat
-    
-    # 1. ADMIN IMMUNITY
-    try:
-        member = await context.bot.get_chat_member(chat.id, user.id)
-        if member.status in ['creator', 'administrator']:
-            return # Admins can do whatever they want
-    except Exception:
-        pass 
-
-    # 2. FLOOD CONTROL
-    if await check_flood(user.id):
-        try:
-            # Delete Spam
-            await update.message.delete()
-            
-            # Mute User
-            await context.bot.restrict_chat_member(
+
+    # 3. ADMIN IMMUNITY
+    if await _is_immune(context, chat.id, user.id):
+        return # Admins can do whatever they want
+
+    if verdict == FLOOD:
+        # Delete Spam + Mute User + Send Warning, all in parallel
+        failure_note = "Flood action failed (Bot likely not Admin)"
+        actions = (
+            update.message.delete(),
+            context.bot.restrict_chat_member(
                 chat_id=chat.id,
                 user_id=user.id,
                 permissions=RESTRICTED_PERMISSIONS,
                 until_date=time.time() + MUTE_DURATION,
                 use_independent_chat_permissions=True 
-            )
-            
-            # Send Warning (Self-destructing message)
-            warn = await context.bot.send_message(
+            ),
+            context.bot.send_message(
                 chat_id=chat.id,
                 text=f"🚫 {user.mention_markdown()}, **SPAM DETECTED!** You are muted for 5 mins. ⏳",
                 parse_mode='Markdown'
             )
-            # Schedule warning deletion (requires JobQueue, or just leave it)
-            
-            logger.warning(f"User {user.id} muted for flooding.")
-            raise ApplicationHandlerStop() # STOP PROCESSING
-            
-        except Exception as e:
-            logger.error(f"Flood action failed (Bot likely not Admin): {e}")
-
-    # 3. CONTENT ANALYSIS
-    text = update.message.text.lower()
-    violation = False
-    
-    # Link Filter
-    if update.message.entities:
-        for entity in update.message.entities:
-            if entity.type in ['url', 'text_link']:
-                if not any(d in text for d in WHITELIST_DOMAINS):
-                    violation = True
-                    break
-    
-    # Bad Words Filter
-    if not violation:
-        for word in BAD_WORDS:
-            if word in text:
-                violation = True
-                break
-
-    # Action
-    if violation:
-        try:
-            await update.message.delete()
-            await context.bot.send_message(
+        )
+        logger.warning(f"User {user.id} muted for flooding.")
+    else:
+        failure_note = "Violation action failed (Bot likely not Admin)"
+        actions = (
+            update.message.delete(),
+            context.bot.send_message(
                 chat_id=chat.id,
                 text=f"⚠️ {user.mention_markdown()}, **No unauthorized links/shilling!** 🛡️",
                 parse_mode='Markdown'
             )
-            raise ApplicationHandlerStop()
-        except Exception:
-            pass
+        )
+
+    context.application.create_task(_run_actions(failure_note, *actions), name=f"moderation_{chat.id}")
+    raise ApplicationHandlerStop() # STOP PROCESSING
+
+def _local_verdict(update: Update):
+    """Flood and content checks (no API calls). Returns FLOOD, VIOLATION or None."""
+    # 1. FLOOD CONTROL
+    if check_flood(update.message.from_user.id):
+        return FLOOD
+
+    # 2. CONTENT ANALYSIS
+    # Link Filter (every URL must be whitelisted on its own)
+    urls = update.message.parse_entities([MessageEntity.URL, MessageEntity.TEXT_LINK])
+    for entity, entity_text in urls.items():
+        url = entity.url if entity.type == MessageEntity.TEXT_LINK else entity_text
+        if not is_whitelisted_url(url):
+            return VIOLATION
+
+    # Bad Words Filter (case-insensitive pattern, no lowercased copy needed)
+    if BAD_WORDS_RE.search(update.message.text):
+        return VIOLATION
+    return None
+
+async def admin_change_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    [Event: Chat Member Update]
+    Drops the cached admin list of a chat when someone is promoted or
+    demoted, so admin immunity updates immediately.
+    Regular joins/leaves keep the cache.
+    """
+    change = update.chat_member
+    if change.old_chat_member.status in ADMIN_STATUSES or change.new_chat_member.status in ADMIN_STATUSES:
+        AdminService.invalidate(change.chat.id)
 
 # --- LOCKDOWN COMMANDS ---
+ADMIN_ONLY_TEXT = "🚫 Only Admins can use this command."
+
+async def _set_chat_lock(update: Update, context: ContextTypes.DEFAULT_TYPE, permissions: ChatPermissions, notice: str):
+    """Applies chat-wide permissions (callers are admin-only commands)."""
+    chat = update.effective_chat
+    user = update.effective_user
+
+    try:
+        await context.bot.set_chat_permissions(
+            chat_id=chat.id,
+            permissions=permissions,
+            use_independent_chat_permissions=True
+        )
+        await update.message.reply_text(notice, parse_mode='Markdown')
+        logger.warning(f"Chat {chat.id} permissions changed by admin {user.id}.")
+
+    except Exception as e:
+        logger.error(f"Lock action failed (Bot likely not Admin): {e}")
+
+@admin_only(ADMIN_ONLY_TEXT)
 async def lockdown_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Locks the chat for everyone except admins."""
-    # (Existing implementation logic, just ensure comments are English)
-    # ... [Keep your previous logic or ask if you need this refactored too]
-    pass 
-    # (Note: Assuming you kept the previous lockdown logic, just ensure it's imported in main)
+    """
+    [Command: /lockdown]
+    Locks the chat for everyone except admins.
+    """
+    await _set_chat_lock(
+        update, context, LOCKDOWN_PERMISSIONS,
+        "🚨 **LOCKDOWN ACTIVE** 🚨\n\nChat is frozen. Only Admins can speak. 🛡️"
+    )
 
+@admin_only(ADMIN_ONLY_TEXT)
 async def unlock_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Unlocks the chat."""
-    pass
\ No newline at end of file
+    """
+    [Command: /unlock]
+    Unlocks the chat.
+    """
+    await _set_chat_lock(
+        update, context, UNLOCK_PERMISSIONS,
+        "✅ **Chat Unlocked!**\n\nEveryone can speak again. WAGMI! 🐸"
+    )
@@ -1,214 +1,517 @@
+import asyncio
+import bisect
+import functools
 import logging
 import datetime
-import pytz
+import time
+from zoneinfo import ZoneInfo
+from collections import defaultdict, deque
 from telegram import Update
+from telegram.error import BadRequest, Forbidden, ChatMigrated
 from telegram.ext import ContextTypes, JobQueue
-from telegram.error import BadRequest, Forbidden
 from src.services.news_service import NewsService
 from src.services.gemini_service import GeminiService
 from src.services.market_service import MarketService
+from src.services.admin_service import admin_only
+from src.core.state_store import StateStore
 
 # Initialize Logger
 logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
 # Timezone: Istanbul (UTC+3)
-TIMEZONE_TARGET = pytz.timezone("Europe/Istanbul")
+# stdlib zoneinfo: a plain tzinfo that datetime.time(..., tzinfo=...) resolves
+# correctly (a pytz zone used this way falls back to its LMT offset, +01:56).
+TIMEZONE_TARGET = ZoneInfo("Europe/Istanbul")
+
+# Flash News de-duplication: {chat_id: deque([link, ...])}
+# Remembers the last N links published per chat, so the same story is never
+# sent twice to a chat (and other chats keep their own history).
+SENT_LINKS_PER_CHAT = 64
+FLASH_NEWS_CANDIDATES = 5
+# Flash updates skip stories older than this (items without a date still qualify)
+FLASH_NEWS_MAX_AGE = 6 * 3600  # Seconds
+_sent_links = defaultdict(lambda: deque(maxlen=SENT_LINKS_PER_CHAT))
+
+# --- MESSAGE TEMPLATES (built once, filled per broadcast) ---
+FLASH_REPORT_TEMPLATE = "⚡ **TOPI FLASH REPORT** ⚡\n\n{digest}\n\n📢 #Pepetopia #CryptoNews"
+DAILY_DIGEST_TEMPLATE = "🗞️ **TOPI DAILY DIGEST | {edition}**\n\n{digest}\n\n📢 #Pepetopia #Crypto"
+FLASH_INFO_TEMPLATE = "🚨 **TOPI FLASH INFO** 🚨\n\n{summary}\n\n🔗 [Source]({link})"
+FEAR_GREED_TEMPLATE = (
+    "🧠 **MARKET PSYCHOLOGY**\n\n"
+    "📊 **Status:** `{classification}`\n"
+    "🔢 **Score:** `{value}/100`\n\n"
+    "🐸 **TOPI's Take:**\n_{comment}_"
+)
+# Fear & Greed score buckets: <25 | 25-60 | 61-75 | >75
+FEAR_GREED_THRESHOLDS = (25, 61, 76)
+FEAR_GREED_COMMENTS = (
+    "Blood in the streets. Opportunity? 🤔",
+    "Market is undecided.",
+    "Sentiment is bullish! 🚀",
+    "Extreme Greed! Watch out. 📉",
+)
+GAINERS_TEMPLATE = "🚀 **MARKET MOVERS (Top 5)**\n\n{rows}"
+GAINER_ROW_TEMPLATE = "{rank}. **{symbol}**: `${price}` (💚 +{change:.2f}%)\n"
+LONG_SHORT_TEMPLATE = (
+    "⚖️ **LONG vs SHORT (BTC)**\n\n"
+    "📈 **Longs:** `{longs:.1f}%`\n"
+    "📉 **Shorts:** `{shorts:.1f}%`\n"
+    "📊 **Ratio:** `{ratio:.2f}`\n\n"
+    "🏆 **Sentiment:** **{bias}**"
+)
+MARKET_BRIEF_TEMPLATE = "📊 **TOPI MARKET BRIEF** 📊\n\n{sections}\n\n🔥 *Powered by TOPI Radar*"
+MARKET_BRIEF_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+# Static replies (sent as-is)
+DIGEST_BUSY_TEXT = "⏳ Already working on it..."
+DIGEST_SCANNING_TEXT = "🕵️‍♂️ **Scanning the market...**"
+DIGEST_SYNTHESIZING_TEXT = "🧠 **Synthesizing data...**"
+DIGEST_NO_NEWS_TEXT = "⚠️ **System Notice:** No significant news found."
+AUTOPILOT_ON_TEXT = "✅ **Autopilot V2 Activated!**\n\nTOPI is now broadcasting Major + Micro updates 24/7."
+AUTOPILOT_OFF_TEXT = "🛑 **Autopilot Deactivated.**"
+AUTOPILOT_DENIED_TEXT = "🚫 Only Admins can control Autopilot."
+
+# Market data cache: {key: (data, expires_at)}
+# Matches how often each source actually changes. Failed fetches aren't cached.
+MARKET_CACHE_TTL = {"fng": 3600, "gainers": 120, "ls": 300}  # Seconds
+_market_cache = {}
+_market_locks = defaultdict(asyncio.Lock)
+
+# Digest generation: at most N Gemini digests at once, and chats asking for
+# the same news batch at the same time share one in-flight request.
+# {tuple(links): asyncio.Future}
+DIGEST_CONCURRENCY = 4
+_digest_semaphore = asyncio.Semaphore(DIGEST_CONCURRENCY)
+_digest_inflight = {}
+
+# Finished digests are reused while the headlines are unchanged, so a quiet
+# news day doesn't pay for the same Gemini digest twice.
+# {tuple(links): (digest_text, expires_at)}
+DIGEST_CACHE_TTL = 1800  # 30 Minutes
+_digest_cache = {}
+
+# Chats with a /digest currently in progress (repeated taps are not re-run)
+_digest_running = set()
+
+# Recently handled command updates: {update_id: expires_at}
+# Telegram may redeliver an update after a reconnect; a repeat within the
+# window is ignored instead of running the command (and replying) twice.
+UPDATE_DEDUP_TTL = 60  # Seconds
+UPDATE_DEDUP_MAX = 1024
+_seen_updates = {}
+
+# Autopilot subscribers. Broadcasts run as global jobs (see DAILY_SCHEDULE)
+# and fan out to every chat in this set.
+SUBSCRIBED_CHATS = set()
+
+# Broadcast fan-out: at most N sends in flight at once. Pacing against
+# Telegram's limits (30 msg/s, 20 msg/min per group) is done by the
+# AIORateLimiter in main.py; this only keeps a big fan-out from opening
+# hundreds of pending requests at the same time.
+BROADCAST_CONCURRENCY = 16
+_broadcast_semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+
+def load_sent_links():
+    """Restores the per-chat link history from the StateStore (called once at startup)."""
+    for chat_id, links in StateStore.load_sent_links().items():
+        _sent_links[chat_id].extend(links)
 
 # =========================================
 # SECTION 1: TASK HANDLERS (Workers)
 # =========================================
 
+def _unsubscribe(chat_id: int):
+    """Removes a chat from Autopilot (memory + StateStore)."""
+    SUBSCRIBED_CHATS.discard(chat_id)
+    StateStore.remove_subscription(chat_id)
+
+def _record_sent_link(chat_id: int, link: str):
+    """Remembers a published news link for the chat (memory + StateStore)."""
+    _sent_links[chat_id].append(link)
+    StateStore.add_sent_link(chat_id, link, keep=SENT_LINKS_PER_CHAT)
+
+async def _send_and_log(bot, chat_id: int, text: str, label: str, news_link: str = None, **kwargs):
+    """
+    Sends a scheduled broadcast and logs the outcome.
+    `news_link` (if given) is recorded as sent only once the message went out,
+    so a failed delivery doesn't suppress the story for that chat.
+    Chats the bot can no longer post to are dropped from Autopilot,
+    upgraded groups (supergroup migration) are moved to their new ID.
+    """
+    try:
+        async with _broadcast_semaphore:
+            await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        if news_link:
+            _record_sent_link(chat_id, news_link)
+        logger.info(f"✅ {label} sent to {chat_id}.")
+    except Forbidden as e:
+        _unsubscribe(chat_id)
+        logger.warning(f"Chat {chat_id} removed from Autopilot (bot blocked or kicked): {e}")
+    except ChatMigrated as e:
+        _unsubscribe(chat_id)
+        SUBSCRIBED_CHATS.add(e.new_chat_id)
+        StateStore.add_subscription(e.new_chat_id)
+        logger.warning(f"Chat {chat_id} migrated to {e.new_chat_id}, Autopilot subscription moved.")
+    except Exception as e:
+        logger.error(f"{label} delivery to {chat_id} failed: {e}")
+
+def _broadcast(context: ContextTypes.DEFAULT_TYPE, chat_id: int, text: str, label: str, news_link: str = None, **kwargs):
+    """
+    Hands the send over to a background task, so the job returns right away
+    and the JobQueue isn't held up by Telegram latency or rate-limit backoff.
+    """
+    context.application.create_task(
+        _send_and_log(context.bot, chat_id, text, label, news_link, **kwargs),
+        name=f"broadcast_{chat_id}_{label}"
+    )
+
+async def _cached(key: str, fn, *args):
+    """
+    Awaits a MarketService call, served from cache while fresh.
+    Concurrent misses on the same key wait for one fetch (per-key lock), and
+    if the source fails the last known (stale) value is returned instead.
+    """
+    cached = _market_cache.get(key)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    async with _market_locks[key]:
+        # Another caller may have refreshed it while we waited
+        cached = _market_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        data = await fn(*args)
+        if data:
+            _market_cache[key] = (data, time.monotonic() + MARKET_CACHE_TTL[key])
+            return data
+        if cached:
+            logger.warning(f"Market source '{key}' failed, serving stale data.")
+            return cached[0]
+        return data
+
+def _store_digest(key: tuple, digest_text: str):
+    """Caches a finished digest (outage fallbacks are not cached) and drops expired entries."""
+    if digest_text == GeminiService.FALLBACK_REPLY:
+        return
+    now = time.monotonic()
+    for stale in [k for k, (_, expires_at) in _digest_cache.items() if expires_at <= now]:
+        del _digest_cache[stale]
+    _digest_cache[key] = (digest_text, now + DIGEST_CACHE_TTL)
+
+async def _generate_digest(news_batch: list) -> str:
+    """GeminiService.generate_daily_digest, bounded, cached and de-duplicated per news batch."""
+    key = tuple(item['link'] for item in news_batch)
+    cached = _digest_cache.get(key)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    future = _digest_inflight.get(key)
+    if future is None:
+        async def run():
+            async with _digest_semaphore:
+                digest_text = await GeminiService.generate_daily_digest(news_batch)
+            _store_digest(key, digest_text)
+            return digest_text
+
+        future = asyncio.ensure_future(run())
+        _digest_inflight[key] = future
+        future.add_done_callback(lambda _: _digest_inflight.pop(key, None))
+    return await asyncio.shield(future)
+
+async def _deliver_all(bot, chat_ids: tuple, text: str, label: str, **kwargs):
+    """Sends one message to many chats concurrently (bounded, see BROADCAST_CONCURRENCY)."""
+    await asyncio.gather(*(_send_and_log(bot, chat_id, text, label, **kwargs) for chat_id in chat_ids))
+    logger.info(f"📡 {label} broadcast finished ({len(chat_ids)} chat(s)).")
+
+def _broadcast_all(context: ContextTypes.DEFAULT_TYPE, text: str, label: str, **kwargs):
+    """Fans one prepared message out to every subscribed chat (in one background task)."""
+    context.application.create_task(
+        _deliver_all(context.bot, tuple(SUBSCRIBED_CHATS), text, label, **kwargs),
+        name=f"broadcast_all_{label}"
+    )
+
+def once_per_update(handler):
+    """Command decorator: skips updates already handled in the last UPDATE_DEDUP_TTL seconds."""
+    @functools.wraps(handler)
+    async def wrapper(update, context):
+        now = time.monotonic()
+        if _seen_updates.get(update.update_id, 0) > now:
+            logger.info(f"Ignoring redelivered update {update.update_id}.")
+            return
+        if len(_seen_updates) > UPDATE_DEDUP_MAX:
+            for update_id in [uid for uid, expires_at in _seen_updates.items() if expires_at <= now]:
+                del _seen_updates[update_id]
+        _seen_updates[update.update_id] = now + UPDATE_DEDUP_TTL
+        return await handler(update, context)
+    return wrapper
+
+@once_per_update
 async def instant_news_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """[Command: /digest] Triggers an immediate digest."""
+    """[Command: /digest] Triggers an immediate digest (one at a time per chat)."""
     chat_id = update.effective_chat.id
-    await context.bot.send_chat_action(chat_id=chat_id, action="typing")
-    status_msg = await update.message.reply_text("🕵️‍♂️ **Scanning the market...**", parse_mode='Markdown')
 
+    if chat_id in _digest_running:
+        await update.message.reply_text(DIGEST_BUSY_TEXT)
+        return
+
+    _digest_running.add(chat_id)
+    try:
+        await _run_instant_digest(update, context, chat_id)
+    finally:
+        _digest_running.discard(chat_id)
+
+async def _run_instant_digest(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int):
+    """Scans the news and posts the flash report, updating a status message along the way."""
     try:
-        news_batch = await NewsService.get_recent_news(limit=6)
+        # Status UI and the RSS scan are independent: run them side by side
+        _, status_msg, news_batch = await asyncio.gather(
+            context.bot.send_chat_action(chat_id=chat_id, action="typing"),
+            update.message.reply_text(DIGEST_SCANNING_TEXT, parse_mode='Markdown'),
+            NewsService.get_recent_news(limit=6),
+            return_exceptions=True
+        )
+        if isinstance(status_msg, Exception):
+            raise status_msg
+        if isinstance(news_batch, Exception):
+            logger.error(f"News fetch failed in instant_news_command: {news_batch}")
+            news_batch = []
+
         if news_batch:
-            await context.bot.edit_message_text(chat_id=chat_id, message_id=status_msg.message_id, text="🧠 **Synthesizing data...**", parse_mode='Markdown')
-            digest_text = await GeminiService.generate_daily_digest(news_batch)
-            message = f"⚡ **TOPI FLASH REPORT** ⚡\n\n{digest_text}\n\n📢 #Pepetopia #CryptoNews"
-            await context.bot.delete_message(chat_id=chat_id, message_id=status_msg.message_id)
-            await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown')
+            # The status edit overlaps with the (slow) Gemini call
+            _, digest_text = await asyncio.gather(
+                context.bot.edit_message_text(chat_id=chat_id, message_id=status_msg.message_id, text=DIGEST_SYNTHESIZING_TEXT, parse_mode='Markdown'),
+                _generate_digest(news_batch),
+                return_exceptions=True
+            )
+            if isinstance(digest_text, Exception):
+                raise digest_text
+            message = FLASH_REPORT_TEMPLATE.format(digest=digest_text)
+            # The status message turns into the report (one API call)
+            try:
+                await context.bot.edit_message_text(chat_id=chat_id, message_id=status_msg.message_id, text=message, parse_mode='Markdown', disable_web_page_preview=True)
+            except BadRequest as e:
+                # Status message gone or no longer editable: post the report instead
+                logger.warning(f"Status edit failed in instant_news_command ({e}), sending report.")
+                await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown', disable_web_page_preview=True)
         else:
-            await context.bot.edit_message_text(chat_id=chat_id, message_id=status_msg.message_id, text="⚠️ **System Notice:** No significant news found.", parse_mode='Markdown')
+            await context.bot.edit_message_text(chat_id=chat_id, message_id=status_msg.message_id, text=DIGEST_NO_NEWS_TEXT, parse_mode='Markdown')
     except Exception as e:
         logger.error(f"Error in instant_news_command: {e}", exc_info=True)
 
 async def news_digest_job(context: ContextTypes.DEFAULT_TYPE):
-    """[Scheduled Job] Morning/Evening English Digest."""
-    job = context.job
-    chat_id = job.chat_id
-    logger.info(f"Starting Major News Digest for Chat ID: {chat_id}")
+    """
+    [Scheduled Job] Morning/Evening English Digest.
+    Fetched and written once, then sent to every subscribed chat.
+    """
+    if not SUBSCRIBED_CHATS:
+        return
+    edition = "🌞 MORNING EDITION" if "morning" in str(context.job.name) else "🌙 EVENING EDITION"
+    logger.info(f"Starting Major News Digest for {len(SUBSCRIBED_CHATS)} chat(s).")
 
     try:
         news_batch = await NewsService.get_recent_news(limit=8)
         if news_batch:
-            digest_text = await GeminiService.generate_daily_digest(news_batch)
-            edition = "🌞 MORNING EDITION" if "morning" in str(job.name) else "🌙 EVENING EDITION"
-            message = f"🗞️ **TOPI DAILY DIGEST | {edition}**\n\n{digest_text}\n\n📢 #Pepetopia #Crypto"
-            await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown')
-            logger.info(f"✅ Digest ({edition}) sent to {chat_id}.")
+            digest_text = await _generate_digest(news_batch)
+            if digest_text == GeminiService.FALLBACK_REPLY:
+                logger.warning("Skipped digest: AI unavailable.")
+                return
+            message = DAILY_DIGEST_TEMPLATE.format(edition=edition, digest=digest_text)
+            _broadcast_all(context, message, f"Digest ({edition})", parse_mode='Markdown')
         else:
-            logger.warning(f"Skipped digest for {chat_id}: No news.")
+            logger.warning("Skipped digest: No news.")
     except Exception as e:
         logger.error(f"Digest Job Failed: {e}")
 
 async def flash_news_job(context: ContextTypes.DEFAULT_TYPE):
     """
     [Scheduled Job] Micro-Updates (TR/ES).
-    Fetches 1 FRESH news item and summarizes it in Turkish & Spanish.
+    Fetches 1 FRESH news item per chat and summarizes it in Turkish & Spanish.
+    News is fetched once; chats that get the same item share one summary.
+    Quiet hours (nothing new or recent) cost no Gemini call and send nothing.
     """
-    job = context.job
-    chat_id = job.chat_id
+    if not SUBSCRIBED_CHATS:
+        return
     
     try:
-        # Fetch just 1 latest news item
-        news_batch = await NewsService.get_recent_news(limit=1)
-        
-        if news_batch:
-            news_item = news_batch[0]
-            # Generate Bilingual Summary
-            flash_text = await GeminiService.generate_flash_update(news_item)
-            
-            message = (
-                f"🚨 **TOPI FLASH INFO** 🚨\n\n"
-                f"{flash_text}\n\n"
-                f"🔗 [Source]({news_item['link']})"
-            )
-            await context.bot.send_message(chat_id=chat_id, text=message, parse_mode='Markdown', disable_web_page_preview=True)
-            logger.info(f"✅ Flash Update (TR/ES) sent to {chat_id}.")
-        else:
+        # Fetch a few candidates, each chat gets the first one it hasn't seen yet
+        news_batch = await NewsService.get_recent_news(limit=FLASH_NEWS_CANDIDATES)
+        cutoff = time.time() - FLASH_NEWS_MAX_AGE
+        news_batch = [item for item in news_batch if (item.get('published') or cutoff) >= cutoff]
+        picks = {}  # {link: (news_item, [chat_id, ...])}
+        for chat_id in tuple(SUBSCRIBED_CHATS):
+            seen = _sent_links[chat_id]
+            news_item = next((item for item in news_batch if item['link'] not in seen), None)
+            if news_item:
+                picks.setdefault(news_item['link'], (news_item, []))[1].append(chat_id)
+
+        if not picks:
             logger.info("Skipping Flash Update: No fresh news.")
+            return
+
+        # Generate Bilingual Summaries (one per distinct item, in parallel)
+        summaries = await asyncio.gather(
+            *(GeminiService.generate_flash_update(news_item) for news_item, _ in picks.values()),
+            return_exceptions=True
+        )
+
+        for (news_item, chat_ids), flash_text in zip(picks.values(), summaries):
+            if isinstance(flash_text, Exception):
+                logger.error(f"Flash summary failed for {news_item['link']}: {flash_text}")
+                continue
+            if flash_text == GeminiService.FALLBACK_REPLY:
+                # Gemini outage: send nothing, the story stays fresh for the next slot
+                logger.warning(f"Flash summary unavailable for {news_item['link']}, skipped.")
+                continue
+            message = FLASH_INFO_TEMPLATE.format(summary=flash_text, link=news_item['link'])
+            for chat_id in chat_ids:
+                _broadcast(
+                    context, chat_id, message, "Flash Update (TR/ES)",
+                    news_link=news_item['link'], parse_mode='Markdown', disable_web_page_preview=True
+                )
             
     except Exception as e:
         logger.error(f"Flash News Job Failed: {e}")
 
-async def fear_greed_job(context: ContextTypes.DEFAULT_TYPE):
-    """[Scheduled Job] Fear & Greed Index."""
-    job = context.job
-    chat_id = job.chat_id
-    try:
-        data = MarketService.get_fear_and_greed()
-        if data:
-            value = int(data['value'])
-            classification = data['value_classification']
-            comment = "Market is undecided."
-            if value < 25: comment = "Blood in the streets. Opportunity? 🤔"
-            elif value > 75: comment = "Extreme Greed! Watch out. 📉"
-            elif value > 60: comment = "Sentiment is bullish! 🚀"
-
-            msg = f"🧠 **MARKET PSYCHOLOGY**\n\n📊 **Status:** `{classification}`\n🔢 **Score:** `{value}/100`\n\n🐸 **TOPI's Take:**\n_{comment}_"
-            await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
-    except Exception as e:
-        logger.error(f"F&G Job Failed: {e}")
+def _format_price(price: float) -> str:
+    """CoinGecko prices are already numbers: 2 decimals for $1+, up to 8 decimals below ("N/A" if missing)."""
+    if price is None:
+        return "N/A"
+    if price >= 1:
+        return f"{price:,.2f}"
+    return f"{price:.8f}".rstrip("0").rstrip(".")
+
+def _fear_greed_section(data) -> str:
+    value = int(data['value'])
+    comment = FEAR_GREED_COMMENTS[bisect.bisect_right(FEAR_GREED_THRESHOLDS, value)]
+    return FEAR_GREED_TEMPLATE.format(classification=data['value_classification'], value=value, comment=comment)
 
-async def top_gainers_job(context: ContextTypes.DEFAULT_TYPE):
-    """[Scheduled Job] Top Gainers."""
-    job = context.job
-    chat_id = job.chat_id
+def _gainers_section(coins) -> str:
+    rows = "".join(
+        GAINER_ROW_TEMPLATE.format(
+            rank=i,
+            symbol=coin['symbol'].upper(),
+            price=_format_price(coin['current_price']),
+            change=coin['price_change_percentage_24h'] or 0
+        )
+        for i, coin in enumerate(coins, 1)
+    )
+    return GAINERS_TEMPLATE.format(rows=rows)
+
+def _long_short_section(data) -> str:
+    longs = float(data['longAccount']) * 100
+    shorts = float(data['shortAccount']) * 100
+    ratio = float(data['longShortRatio'])
+    bias = "BULLISH 🐂" if ratio > 1 else "BEARISH 🐻"
+    return LONG_SHORT_TEMPLATE.format(longs=longs, shorts=shorts, ratio=ratio, bias=bias)
+
+async def market_brief_job(context: ContextTypes.DEFAULT_TYPE):
+    """
+    [Scheduled Job] Market Brief: Fear & Greed + Top Gainers + Long/Short.
+    The three sources are fetched in parallel (once, for all subscribed chats)
+    and sent as ONE message per chat. Sources that fail are left out.
+    """
+    if not SUBSCRIBED_CHATS:
+        return
+    session = context.bot_data["http"]
     try:
-        coins = MarketService.get_top_gainers()
+        fng, coins, ls = await asyncio.gather(
+            _cached("fng", MarketService.get_fear_and_greed, session),
+            _cached("gainers", MarketService.get_top_gainers, session),
+            _cached("ls", MarketService.get_long_short_ratio, session, "BTCUSDT")
+        )
+        sections = []
+        if fng:
+            sections.append(_fear_greed_section(fng))
         if coins:
-            list_text = ""
-            for i, coin in enumerate(coins):
-                list_text += f"{i+1}. **{coin['symbol'].upper()}**: `${coin['current_price']}` (💚 +{coin['price_change_percentage_24h']:.2f}%)\n"
-            msg = f"🚀 **MARKET MOVERS (Top 5)**\n\n{list_text}\n🔥 *Powered by TOPI Radar*"
-            await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
-    except Exception as e:
-        logger.error(f"Gainers Job Failed: {e}")
+            sections.append(_gainers_section(coins))
+        if ls:
+            sections.append(_long_short_section(ls))
 
-async def long_short_job(context: ContextTypes.DEFAULT_TYPE):
-    """[Scheduled Job] Long/Short Ratio."""
-    job = context.job
-    chat_id = job.chat_id
-    try:
-        data = MarketService.get_long_short_ratio("BTCUSDT")
-        if data:
-            longs = float(data['longAccount']) * 100
-            shorts = float(data['shortAccount']) * 100
-            ratio = float(data['longShortRatio'])
-            bias = "BULLISH 🐂" if ratio > 1 else "BEARISH 🐻"
-            msg = f"⚖️ **LONG vs SHORT (BTC)**\n\n📈 **Longs:** `{longs:.1f}%`\n📉 **Shorts:** `{shorts:.1f}%`\n📊 **Ratio:** `{ratio}`\n\n🏆 **Sentiment:** **{bias}**"
-            await context.bot.send_message(chat_id=chat_id, text=msg, parse_mode='Markdown')
+        if sections:
+            msg = MARKET_BRIEF_TEMPLATE.format(sections=MARKET_BRIEF_SEPARATOR.join(sections))
+            _broadcast_all(context, msg, "Market Brief", parse_mode='Markdown')
+        else:
+            logger.warning("Skipped Market Brief: all market sources failed.")
     except Exception as e:
-        logger.error(f"L/S Job Failed: {e}")
+        logger.error(f"Market Brief Job Failed: {e}")
 
 # =========================================
 # SECTION 2: SCHEDULER CONTROLLER
 # =========================================
 
-def schedule_all_jobs(job_queue: JobQueue, chat_id: int):
-    """
-    Central Scheduler.
-    Now includes Micro-Updates (Flash Info) in TR/ES.
-    """
-    job_prefix = str(chat_id)
-    
-    # 1. Clean existing jobs
-    current_jobs = job_queue.get_jobs_by_name(job_prefix)
-    for job in current_jobs:
-        job.schedule_removal()
-        
+def _at(hour: int, minute: int) -> datetime.time:
+    """Istanbul wall-clock time for the schedule table."""
+    return datetime.time(hour, minute, tzinfo=TIMEZONE_TARGET)
+
+# Daily broadcast table: (Istanbul time, job, name). Times are built once, at import.
+# Every slot is ONE global job that serves all subscribed chats, so the
+# scheduler tracks one job per slot in total instead of one per slot per chat.
+DAILY_SCHEDULE = (
     # --- MAJOR BROADCASTS (English) ---
-    # 08:30 - Morning News
-    job_queue.run_daily(news_digest_job, time=datetime.time(8, 30, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_morning")
-    # 12:00 - Fear & Greed
-    job_queue.run_daily(fear_greed_job, time=datetime.time(12, 0, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_fng")
-    # 15:30 - Top Gainers
-    job_queue.run_daily(top_gainers_job, time=datetime.time(15, 30, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_gainers")
-    # 18:00 - Long/Short Ratio
-    job_queue.run_daily(long_short_job, time=datetime.time(18, 0, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_ls")
-    # 20:30 - Evening News
-    job_queue.run_daily(news_digest_job, time=datetime.time(20, 30, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_evening")
+    (_at(8, 30), news_digest_job, "morning"),     # Morning News
+    (_at(15, 30), market_brief_job, "market"),    # Market Brief (F&G + Gainers + L/S)
+    (_at(20, 30), news_digest_job, "evening"),    # Evening News
 
     # --- MICRO UPDATES (TR/ES Flash Info) ---
     # Daytime Cycle
-    job_queue.run_daily(flash_news_job, time=datetime.time(10, 0, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_flash_1")
-    job_queue.run_daily(flash_news_job, time=datetime.time(13, 45, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_flash_2")
-    job_queue.run_daily(flash_news_job, time=datetime.time(16, 45, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_flash_3")
-    
+    (_at(10, 0), flash_news_job, "flash_1"),
+    (_at(13, 45), flash_news_job, "flash_2"),
+    (_at(16, 45), flash_news_job, "flash_3"),
     # Night Cycle
-    job_queue.run_daily(flash_news_job, time=datetime.time(21, 45, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_flash_4")
-    job_queue.run_daily(flash_news_job, time=datetime.time(23, 0, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_flash_5")
-    job_queue.run_daily(flash_news_job, time=datetime.time(0, 15, tzinfo=TIMEZONE_TARGET), chat_id=chat_id, name=f"{job_prefix}_flash_6")
-    
-    logger.info(f"✅ All 11 jobs scheduled for chat {chat_id} (Major + Micro Updates).")
+    (_at(21, 45), flash_news_job, "flash_4"),
+    (_at(23, 0), flash_news_job, "flash_5"),
+    (_at(0, 15), flash_news_job, "flash_6"),
+)
+
+# APScheduler options for the broadcast jobs. run_daily already fires on a
+# wall-clock cron trigger (no interval drift); these make a late fire (busy
+# event loop, slow Gemini call) still run instead of being dropped, and fold
+# missed fires of one slot into a single run.
+BROADCAST_JOB_KWARGS = {"misfire_grace_time": 600, "coalesce": True}
+
+def _schedule_global_jobs(job_queue: JobQueue):
+    """
+    Registers the broadcast table (shared by all subscribed chats).
+    Idempotent: only slots without a job are added, existing jobs are never rebuilt.
+    """
+    added = 0
+    for at, callback, name in DAILY_SCHEDULE:
+        if not job_queue.get_jobs_by_name(f"global_{name}"):
+            job_queue.run_daily(callback, time=at, name=f"global_{name}", job_kwargs=BROADCAST_JOB_KWARGS)
+            added += 1
+    if added:
+        logger.info(f"✅ {added} global broadcast jobs scheduled (Major + Micro Updates).")
+
+def schedule_all_jobs(job_queue: JobQueue, chat_id: int):
+    """
+    Central Scheduler.
+    Subscribes the chat to every broadcast (Major + Micro Updates in TR/ES).
+    """
+    _schedule_global_jobs(job_queue)
+    if chat_id in SUBSCRIBED_CHATS:
+        return  # Already armed, nothing to do
+    SUBSCRIBED_CHATS.add(chat_id)
+    StateStore.add_subscription(chat_id)
+    logger.info(f"✅ Chat {chat_id} subscribed to Autopilot.")
+
+def restore_subscriptions(job_queue: JobQueue):
+    """Re-subscribes every chat saved in the StateStore (called once at startup)."""
+    for chat_id in StateStore.load_subscriptions():
+        schedule_all_jobs(job_queue, chat_id)
 
+@once_per_update
+@admin_only(AUTOPILOT_DENIED_TEXT)
 async def start_schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Activates Autopilot."""
-    user_id = update.effective_user.id
     chat_id = update.effective_chat.id
-    
-    try:
-        member = await context.bot.get_chat_member(chat_id, user_id)
-        if member.status not in ['creator', 'administrator']:
-            await update.message.reply_text("🚫 Only Admins can control Autopilot.")
-            return
-    except Exception:
-        return
-
     schedule_all_jobs(context.job_queue, chat_id)
-    await update.message.reply_text("✅ **Autopilot V2 Activated!**\n\nTOPI is now broadcasting Major + Micro updates 24/7.", parse_mode='Markdown')
+    await update.message.reply_text(AUTOPILOT_ON_TEXT, parse_mode='Markdown')
 
+@once_per_update
+@admin_only()
 async def stop_schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Deactivates Autopilot."""
-    user_id = update.effective_user.id
-    chat_id = update.effective_chat.id
-    
-    try:
-        member = await context.bot.get_chat_member(chat_id, user_id)
-        if member.status not in ['creator', 'administrator']:
-            return
-    except Exception:
-        return
-
-    job_prefix = str(chat_id)
-    current_jobs = [j for j in context.job_queue.jobs() if j.name and j.name.startswith(job_prefix)]
-    for job in current_jobs:
-        job.schedule_removal()
-    
-    await update.message.reply_text("🛑 **Autopilot Deactivated.**")
\ No newline at end of file
+    _unsubscribe(update.effective_chat.id)
+    await update.message.reply_text(AUTOPILOT_OFF_TEXT)
\ No newline at end of file
@@ -1,11 +1,48 @@
+import asyncio
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ChatPermissions
-from telegram.ext import ContextTypes
-from telegram.error import BadRequest, Forbidden
+from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.error import Forbidden
+from src.services.admin_service import AdminService
 
 # Initialize Logger
 logger = logging.getLogger(__name__)
 
+# --- CAPTCHA CALLBACK ---
+# callback_data format: "verify_<user_id>"
+VERIFY_PREFIX = "verify_"
+VERIFY_BUTTON_TEXT = "🐸 I am Human (Verify)"
+
+# Challenge message ({mention} is filled per user)
+CAPTCHA_TEMPLATE = (
+    "🚨 **Security Alert** 🚨\n\n"
+    "Welcome {mention}, Fren! 🐸\n\n"
+    "To prevent bot raids, you are currently **muted**.\n"
+    "Please click the button below to prove you are human.\n\n"
+    "🛡️ *Protected by TOPI Security*"
+)
+
+def _verify_markup(user_id: int) -> InlineKeyboardMarkup:
+    """One-button CAPTCHA keyboard; only the callback data differs per user."""
+    return InlineKeyboardMarkup(((InlineKeyboardButton(VERIFY_BUTTON_TEXT, callback_data=f"{VERIFY_PREFIX}{user_id}"),),))
+
+class PrefixCallbackQueryHandler(CallbackQueryHandler):
+    """
+    CallbackQueryHandler that matches on a literal data prefix.
+    A plain `str.startswith` replaces the regex match done for `pattern=`.
+    """
+    __slots__ = ("prefix",)
+
+    def __init__(self, callback, prefix: str, block: bool = True):
+        super().__init__(callback, block=block)
+        self.prefix = prefix
+
+    def check_update(self, update: object) -> bool:
+        if not isinstance(update, Update) or not update.callback_query:
+            return False
+        data = update.callback_query.data
+        return isinstance(data, str) and data.startswith(self.prefix)
+
 # --- PERMISSIONS CONFIGURATION ---
 # Protocol: Telegram API v21+ requires granular permission settings.
 
@@ -54,75 +91,91 @@ async def welcome_new_member(update: Update, context: ContextTypes.DEFAULT_TYPE)
     2. Checks if user is Bot/Admin (Skipped).
     3. If Regular User -> Restrict (Mute) immediately.
     4. Sends a Welcome Message with a CAPTCHA button.
+
+    Users joining together (raids, group imports) are handled in parallel,
+    so their Telegram API calls overlap instead of queuing one after another.
     """
     # Filter: Ensure valid message update
     if not update.message or not update.message.new_chat_members:
         return
 
-    for user in update.message.new_chat_members:
-        # Step 1: Ignore Bots (except self)
-        if user.is_bot:
-            if user.id == context.bot.id:
-                # Bot joined the group: Check permissions
-                try:
-                    bot_member = await context.bot.get_chat_member(update.effective_chat.id, context.bot.id)
-                    if bot_member.can_restrict_members:
-                        await update.message.reply_text("🐸 TOPI is online! Fortress Protocol Activated. 🛡️")
-                    else:
-                        await update.message.reply_text(
-                            "⚠️ **System Alert:** I lack 'Restrict Members' permission.\n"
-                            "Please promote me to Admin to enable security features."
-                        )
-                except Exception as e:
-                    logger.error(f"Permission check failed: {e}")
-            continue
-
-        # Step 2: Admin Immunity Check
-        # Admins should never be muted by the bot.
+    chat_id = update.effective_chat.id
+    bot_id = context.bot.id
+    members = update.message.new_chat_members
+
+    # Step 1: Ignore Bots (except self). Pure bot joins end here, before any API call.
+    humans = [user for user in members if not user.is_bot]
+    self_joined = any(user.id == bot_id for user in members)
+    if not humans and not self_joined:
+        return
+
+    actions = []
+    if self_joined:
+        actions.append(_check_own_permissions(update, context, chat_id, bot_id))
+    if humans:
+        # Admin Immunity: one cached admin list serves every user of this event
         try:
-            member_info = await context.bot.get_chat_member(update.effective_chat.id, user.id)
-            if member_info.status in ['creator', 'administrator']:
-                logger.info(f"User {user.id} is Admin/Creator. Skipping verification.")
-                await update.message.reply_text(
-                    f"🫡 Welcome Boss {user.mention_markdown()}! Systems are operational.",
-                    parse_mode='Markdown'
-                )
-                continue
+            admin_ids = await AdminService.get_admin_ids(context.bot, chat_id)
         except Exception as e:
-            logger.error(f"Failed to check admin status for {user.id}: {e}")
+            logger.error("Failed to fetch admins for %s: %s", chat_id, e)
+            admin_ids = frozenset()
+        actions.extend(_welcome_user(update, context, chat_id, user, admin_ids) for user in humans)
 
-        # Step 3: Mute and Verify Logic
-        try:
-            logger.info(f"Initiating verification for user {user.id}...")
-            
-            # Apply Mute (Restrict)
-            await context.bot.restrict_chat_member(
-                chat_id=update.effective_chat.id,
-                user_id=user.id,
-                permissions=RESTRICTED_PERMISSIONS,
-                use_independent_chat_permissions=True 
-            )
-            
-            # Prepare Verification Button
-            keyboard = [[InlineKeyboardButton("🐸 I am Human (Verify)", callback_data=f"verify_{user.id}")]]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+    results = await asyncio.gather(*actions, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("Unexpected error in welcome flow: %s", result, exc_info=result)
 
-            # Send Challenge Message
+async def _check_own_permissions(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, bot_id: int):
+    """Bot joined the group: Check permissions."""
+    try:
+        bot_member = await context.bot.get_chat_member(chat_id, bot_id)
+        if bot_member.can_restrict_members:
+            await update.message.reply_text("🐸 TOPI is online! Fortress Protocol Activated. 🛡️")
+        else:
             await update.message.reply_text(
-                f"🚨 **Security Alert** 🚨\n\n"
-                f"Welcome {user.mention_markdown()}, Fren! 🐸\n\n"
-                "To prevent bot raids, you are currently **muted**.\n"
-                "Please click the button below to prove you are human.\n\n"
-                "🛡️ *Protected by TOPI Security*",
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
+                "⚠️ **System Alert:** I lack 'Restrict Members' permission.\n"
+                "Please promote me to Admin to enable security features."
             )
+    except Exception as e:
+        logger.error("Permission check failed: %s", e)
+
+async def _welcome_user(update: Update, context: ContextTypes.DEFAULT_TYPE, chat_id: int, user, admin_ids: frozenset):
+    """Runs the welcome/verification flow for one joining (human) user."""
+    # Step 2: Admin Immunity Check
+    # Admins should never be muted by the bot.
+    if user.id in admin_ids:
+        logger.info("User %s is Admin/Creator. Skipping verification.", user.id)
+        await update.message.reply_text(
+            f"🫡 Welcome Boss {user.mention_markdown()}! Systems are operational.",
+            parse_mode='Markdown'
+        )
+        return
 
-        except Forbidden as e:
-            logger.critical(f"Permission Denied: Bot cannot restrict users. Error: {e}")
-            await update.message.reply_text("⚠️ **Critical Error:** I need 'Ban Users' permission to function!")
-        except Exception as e:
-            logger.error(f"Unexpected error in welcome flow: {e}")
+    # Step 3: Mute and Verify Logic
+    try:
+        logger.info("Initiating verification for user %s...", user.id)
+        
+        # Apply Mute (Restrict)
+        await context.bot.restrict_chat_member(
+            chat_id=chat_id,
+            user_id=user.id,
+            permissions=RESTRICTED_PERMISSIONS,
+            use_independent_chat_permissions=True 
+        )
+        
+        # Send Challenge Message (with Verification Button)
+        await update.message.reply_text(
+            CAPTCHA_TEMPLATE.format(mention=user.mention_markdown()),
+            reply_markup=_verify_markup(user.id),
+            parse_mode='Markdown'
+        )
+
+    except Forbidden as e:
+        logger.critical("Permission Denied: Bot cannot restrict users. Error: %s", e)
+        await update.message.reply_text("⚠️ **Critical Error:** I need 'Ban Users' permission to function!")
+    except Exception as e:
+        logger.error("Unexpected error in welcome flow: %s", e, exc_info=True)
 
 
 async def verify_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -136,19 +189,22 @@ async def verify_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     3. Updates the welcome message to a success state.
     """
     query = update.callback_query
-    await query.answer() # Stop loading animation
 
-    data = query.data
-    try:
-        action, target_user_id = data.split("_")
-    except ValueError:
+    # The handler only routes "verify_<user_id>" data here (see PrefixCallbackQueryHandler)
+    target_user_id = query.data.removeprefix(VERIFY_PREFIX)
+    if not target_user_id.isdigit():
+        await query.answer()
         return # Malformed data
+    target_user_id = int(target_user_id)
 
     # Security Check: Prevent others from clicking the button
-    if str(query.from_user.id) != str(target_user_id):
+    # (a query can be answered only once: the alert IS the answer here)
+    if query.from_user.id != target_user_id:
         await query.answer("❌ Access Denied: This button is not for you!", show_alert=True)
         return
 
+    await query.answer() # Stop loading animation
+
     # Grant Access
     try:
         # Restore Permissions
@@ -166,8 +222,8 @@ async def verify_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "You are now free to chat. WAGMI! 🐸",
             parse_mode='Markdown'
         )
-        logger.info(f"User {target_user_id} verified successfully.")
+        logger.info("User %s verified successfully.", target_user_id)
 
     except Exception as e:
-        logger.error(f"Verification failed for user {target_user_id}: {e}")
+        logger.error("Verification failed for user %s: %s", target_user_id, e)
         await query.edit_message_text("⚠️ Error verifying user. Contact an Admin.")
\ No newline at end of file
@@ -0,0 +1,76 @@
+import functools
+import logging
+import time
+from telegram import Bot
+from src.core.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+class AdminService:
+    """
+    Cached admin lookups.
+    One `get_chat_administrators` call per chat per TTL window serves every
+    admin check in that chat (a set lookup instead of a `get_chat_member`
+    call per user). Entries are dropped early when Telegram reports a member
+    change (see `admin_change_handler` in handlers/moderation.py).
+    The cache is mirrored to the StateStore, so a restart doesn't trigger a
+    burst of admin lookups.
+    """
+
+    CACHE_TTL = 300  # 5 Minutes
+
+    # Cache storage: {chat_id: (frozenset(admin_user_ids), expires_at)}
+    _admin_cache = {}
+
+    @classmethod
+    def load_cache(cls):
+        """Restores still-valid entries from the StateStore (called once at startup)."""
+        cls._admin_cache.update(StateStore.load_admin_cache())
+
+    @classmethod
+    async def get_admin_ids(cls, bot: Bot, chat_id: int) -> frozenset:
+        """Returns the user IDs of the chat's creator and administrators, served from cache while fresh."""
+        now = time.time()  # Wall clock: expiry times are persisted across restarts
+
+        cached = cls._admin_cache.get(chat_id)
+        if cached and cached[1] > now:
+            return cached[0]
+
+        admins = await bot.get_chat_administrators(chat_id)
+        admin_ids = frozenset(admin.user.id for admin in admins)
+        expires_at = now + cls.CACHE_TTL
+        cls._admin_cache[chat_id] = (admin_ids, expires_at)
+        StateStore.save_admin_ids(chat_id, admin_ids, expires_at)
+        return admin_ids
+
+    @classmethod
+    async def is_admin(cls, bot: Bot, chat_id: int, user_id: int) -> bool:
+        """True if the user is the chat creator or an administrator."""
+        return user_id in await cls.get_admin_ids(bot, chat_id)
+
+    @classmethod
+    def invalidate(cls, chat_id: int):
+        """Forgets the cached admin list of one chat."""
+        cls._admin_cache.pop(chat_id, None)
+        StateStore.delete_admin_ids(chat_id)
+
+def admin_only(denied_text: str = None):
+    """
+    Command decorator: runs the handler only for chat admins (cached check).
+    Others get `denied_text` (if set), failed lookups are ignored silently.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(update, context):
+            try:
+                allowed = await AdminService.is_admin(context.bot, update.effective_chat.id, update.effective_user.id)
+            except Exception as e:
+                logger.warning("Admin check failed: %s", e)
+                return
+            if not allowed:
+                if denied_text:
+                    await update.message.reply_text(denied_text)
+                return
+            return await handler(update, context)
+        return wrapper
+    return decorator
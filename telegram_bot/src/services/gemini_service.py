@@ -3,10 +3,40 @@ from google.api_core.exceptions import ResourceExhausted, InternalServerError, S
 import logging
 import re
 import asyncio
+import functools
+import time
 from src.core.app_config import Config
 
 logger = logging.getLogger(__name__)
 
+# --- CONCURRENCY ---
+# Requests use the SDK's native async client (no thread per call). A semaphore
+# still caps concurrent Gemini requests, so chat bursts don't burn the quota
+# all at once.
+GEMINI_MAX_CONCURRENCY = 4
+_GEMINI_SLOTS = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+# Model discovery (list_models) is a blocking HTTPS call: it runs in a thread,
+# once, and is given up on after this many seconds (the safety net is used).
+DISCOVERY_TIMEOUT = 5  # Seconds
+
+# --- MODEL RANKING ---
+# Irrelevant model families (never used for chat): non-text outputs (speech, images)
+# and agent models reject a plain text prompt.
+MODEL_EXCLUDED_TAGS = ("gemma", "nano", "embedding", "tts", "image", "computer-use")
+
+# Version is king (e.g. 2.0 -> 2000 points), the rules below fine-tune within a version.
+MODEL_VERSION_RE = re.compile(r'gemini-(\d+(\.\d+)?)')
+MODEL_SCORE_RULES = (
+    # (substrings (any matches), score)
+    (("pro",), 50),               # Tier Adjustments
+    (("flash",), 20),
+    (("latest",), 10),            # Recency
+    (("exp", "preview"), 5),
+    (("lite",), -50),             # Deprioritize 'Lite' or '8b' models
+    (("8b",), -50),
+)
+
 class GeminiService:
     """
     Advanced AI Service Manager (Chain of Thought & Fallback).
@@ -18,6 +48,26 @@ class GeminiService:
     """
 
     _available_models = []
+    _discovery_lock = asyncio.Lock()
+
+    # Prompts Gemini rejected because of the prompt itself: {hash(prompt): expires_at}
+    # Retrying them on another model would fail the same way. Other 400s
+    # (InvalidArgument) are model config mismatches and fall through the chain.
+    BAD_PROMPT_TTL = 60  # Seconds
+    BAD_PROMPT_MARKERS = ("must not be empty", "contents are required", "contents is not specified", "empty text")
+    _bad_prompts = {}
+
+    # Headline summaries: {(title, source): (summary, expires_at)}
+    # The same story shows up in several RSS feeds; each is summarized once.
+    SUMMARY_CACHE_TTL = 3600  # Seconds
+    SUMMARY_CACHE_MAX = 4096
+    _summary_cache = {}
+
+    # Model clients, built once per model name: {model_name: GenerativeModel}
+    _model_cache = {}
+
+    # Returned when every model in the chain failed (never worth caching)
+    FALLBACK_REPLY = "🐸 My brain is buffering... (Global neural outage, please try again in 5 mins.)"
 
     # --- PERSONA CONFIGURATION ---
     TOPI_SYSTEM_INSTRUCTION = (
@@ -35,6 +85,17 @@ class GeminiService:
         "- Identity: You are loyal to the Pepetopia community. Roast FUDders and hype the believers.\n"
     )
 
+    # --- PROMPT TEMPLATES ---
+    DIGEST_HEADLINE_TEMPLATE = "- {title} (Source: {source})"
+    DIGEST_PROMPT_TEMPLATE = (
+        "Role: You are TOPI, the AI crypto market analyst.\n"
+        "Task: Write a 'Crypto Market Digest' based on these headlines:\n{news}\n\n"
+        "--- FORMATTING RULES ---\n"
+        "1. LANGUAGE: English ONLY (Global Standard).\n"
+        "2. TONE: Witty, energetic, use emojis.\n"
+        "3. FORMAT: Bullet points with bold headers. Keep it concise."
+    )
+
     @classmethod
     def initialize(cls):
         """
@@ -47,150 +108,241 @@ class GeminiService:
         
         try:
             genai.configure(api_key=Config.GEMINI_API_KEY)
+            cls._model_cache.clear()  # Clients are rebuilt for the new configuration
             
             logger.info("📡 Discovering available Gemini models...")
             
-            # 1. Fetch all models from Google API
-            all_raw_models = [m.name for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
-            
-            # Filter out irrelevant models
-            filtered_models = [m for m in all_raw_models if "gemma" not in m and "nano" not in m and "embedding" not in m]
+            # 1. Fetch all models from Google API (one pass: capability + relevance filter,
+            # duplicates dropped with insertion order kept)
+            filtered_models = list(dict.fromkeys(
+                m.name for m in genai.list_models()
+                if 'generateContent' in m.supported_generation_methods
+                and not any(tag in m.name for tag in MODEL_EXCLUDED_TAGS)
+            ))
 
-            # 2. SCORING ALGORITHM
-            def model_scorer(model_name):
-                name = model_name.lower()
-                score = 0.0
-                
-                # Extract version (e.g., 1.5, 2.0)
-                version_match = re.search(r'gemini-(\d+(\.\d+)?)', name)
-                if version_match:
-                    version = float(version_match.group(1))
-                    score += version * 1000  # Base Score (Version is king)
-
-                # Tier Adjustments
-                if "pro" in name: score += 50
-                if "flash" in name: score += 20
-                
-                # Recency
-                if "latest" in name: score += 10
-                if "exp" in name or "preview" in name: score += 5
-                
-                # Deprioritize 'Lite' or '8b' models
-                if "lite" in name: score -= 50
-                if "8b" in name: score -= 50
-                
-                return score
-
-            # Sort descending (Highest score first)
-            sorted_models = sorted(filtered_models, key=model_scorer, reverse=True)
-            
-            # 3. SAFETY NET CONSTRUCTION
-            # Ensure 'gemini-1.5-flash' is the LAST resort due to high limits.
-            final_chain = []
-            safety_net_models = []
-            
-            for m in sorted_models:
-                if "gemini-1.5-flash" in m and "8b" not in m:
-                    safety_net_models.append(m)
-                else:
-                    final_chain.append(m)
-            
-            # Sort safety net to put "latest" first
-            safety_net_models.sort(key=lambda x: "latest" in x, reverse=True)
-            
-            final_chain.extend(safety_net_models)
+            # 2. RANKING (one scored sort)
+            # Regular models by score, then the 'gemini-1.5-flash' safety net
+            # ('latest' first) as the LAST resort due to its high limits.
+            final_chain = sorted(filtered_models, key=cls._chain_rank, reverse=True)
 
             if not final_chain:
                 final_chain = ["models/gemini-2.0-flash-exp", "models/gemini-1.5-pro", "models/gemini-1.5-flash"]
 
             cls._available_models = final_chain
-            logger.info(f"🧬 AI DNA (Optimized Chain): {cls._available_models}")
+            logger.info("🧬 AI DNA (Optimized Chain): %s", cls._available_models)
 
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini Service: {e}")
+            logger.error("Failed to initialize Gemini Service: %s", e)
             cls._available_models = ["models/gemini-1.5-flash"]
 
+    @classmethod
+    async def ensure_initialized(cls):
+        """
+        Runs `initialize` off the event loop (once, concurrent callers wait for it).
+        Called at startup and lazily by the first request if discovery hasn't finished.
+        """
+        async with cls._discovery_lock:
+            if cls._available_models:
+                return
+            try:
+                await asyncio.wait_for(asyncio.to_thread(cls.initialize), timeout=DISCOVERY_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error("Gemini model discovery timed out after %ss, using the safety net.", DISCOVERY_TIMEOUT)
+                cls._available_models = ["models/gemini-1.5-flash"]
+
+    @staticmethod
+    def _score_model(model_name: str) -> float:
+        """Scoring algorithm: version base score + tier/recency adjustments."""
+        name = model_name.lower()
+        score = 0.0
+
+        # Extract version (e.g., 1.5, 2.0)
+        version_match = MODEL_VERSION_RE.search(name)
+        if version_match:
+            score += float(version_match.group(1)) * 1000
+
+        for patterns, points in MODEL_SCORE_RULES:
+            if any(p in name for p in patterns):
+                score += points
+        return score
+
+    @classmethod
+    def _chain_rank(cls, model_name: str) -> tuple:
+        """Sort key (descending) for the model chain, safety net models last."""
+        safety_net = "gemini-1.5-flash" in model_name and "8b" not in model_name
+        return (not safety_net, safety_net and "latest" in model_name, cls._score_model(model_name))
+
+    @classmethod
+    def _get_model(cls, model_name: str):
+        """Returns the (cached) GenerativeModel for a model name."""
+        model = cls._model_cache.get(model_name)
+        if model is None:
+            model = genai.GenerativeModel(
+                model_name=model_name,
+                system_instruction=cls.TOPI_SYSTEM_INSTRUCTION,
+                # tools=[{"google_search_retrieval": {}}]  (Only for "pro" / "gemini-2" models, currently disabled)
+            )
+            cls._model_cache[model_name] = model
+        return model
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _generation_config(temperature: float):
+        """GenerationConfig per temperature (only a handful are used)."""
+        return genai.types.GenerationConfig(temperature=temperature)
+
     @classmethod
     async def _generate_with_retry(cls, prompt: str, temperature: float = 0.8) -> str:
         """
         THE SURVIVAL LOOP:
         Iterates through the model chain. On 429 (Quota) error, retries immediately with next model.
+        Config mismatches (400) skip to the next model; a prompt that is invalid
+        in itself (e.g. empty) is not retried.
         """
+        prompt_key = hash(prompt)
+        if not prompt.strip() or cls._bad_prompts.get(prompt_key, 0) > time.monotonic():
+            return cls.FALLBACK_REPLY
+
         if not cls._available_models:
-            cls.initialize()
+            await cls.ensure_initialized()
 
         last_error = None
 
         for i, model_name in enumerate(cls._available_models):
             try:
-                # Tools config (Only for capable models)
-                tools = []
-                if "pro" in model_name or "gemini-2" in model_name:
-                    tools = [{"google_search_retrieval": {}}]
-
-                model = genai.GenerativeModel(
-                    model_name=model_name,
-                    system_instruction=cls.TOPI_SYSTEM_INSTRUCTION,
-                    # tools=tools 
-                )
-                
-                config = genai.types.GenerationConfig(temperature=temperature)
-                
-                # Async execution
-                response = await asyncio.to_thread(
-                    model.generate_content, 
-                    prompt, 
-                    generation_config=config
-                )
+                model = cls._get_model(model_name)
+                config = cls._generation_config(temperature)
+
+                # Native async call (bounded, the event loop stays free)
+                async with _GEMINI_SLOTS:
+                    response = await model.generate_content_async(prompt, generation_config=config)
                 
                 if response.text:
                     return response.text
 
             except (ResourceExhausted, InternalServerError, ServiceUnavailable) as e:
-                logger.warning(f"⚠️ Quota Hit/Server Error on {model_name}. Switching... ({e})")
+                logger.warning("⚠️ Quota Hit/Server Error on %s. Switching... (%s)", model_name, e)
                 last_error = e
                 continue 
             
             except InvalidArgument as e:
-                logger.warning(f"⚠️ Config Mismatch on {model_name}. Skipping...")
+                if cls._is_prompt_error(e):
+                    logger.warning("⚠️ Prompt rejected on %s, not retrying other models. (%s)", model_name, e)
+                    cls._remember_bad_prompt(prompt_key)
+                    return cls.FALLBACK_REPLY
+                logger.warning("⚠️ Config Mismatch on %s. Skipping... (%s)", model_name, e)
                 last_error = e
                 continue
 
             except Exception as e:
-                logger.error(f"❌ Unexpected Error on {model_name}: {e}")
+                logger.error("❌ Unexpected Error on %s: %s", model_name, e)
                 last_error = e
                 continue
 
-        logger.critical(f"💀 All AI models failed. Last Error: {last_error}")
-        return "🐸 My brain is buffering... (Global neural outage, please try again in 5 mins.)"
+        logger.critical("💀 All AI models failed. Last Error: %s", last_error)
+        return cls.FALLBACK_REPLY
+
+    @classmethod
+    def _is_prompt_error(cls, error: Exception) -> bool:
+        """True if a 400 is about the prompt itself (not about the model's config)."""
+        message = str(error).lower()
+        return any(marker in message for marker in cls.BAD_PROMPT_MARKERS)
+
+    @classmethod
+    def _remember_bad_prompt(cls, prompt_key: int):
+        """Short-circuits a rejected prompt for BAD_PROMPT_TTL (expired entries are dropped)."""
+        now = time.monotonic()
+        for key in [k for k, expires_at in cls._bad_prompts.items() if expires_at <= now]:
+            del cls._bad_prompts[key]
+        cls._bad_prompts[prompt_key] = now + cls.BAD_PROMPT_TTL
 
     @classmethod
     async def get_response(cls, user_text: str):
         """Chat wrapper."""
         return await cls._generate_with_retry(user_text, temperature=0.9)
 
+    @classmethod
+    async def stream_response(cls, user_text: str):
+        """
+        Chat wrapper, streaming: yields the reply text as it grows (always at least once).
+        Walks the model chain like the Survival Loop until a model starts answering;
+        once text was yielded an error ends the stream (the partial reply stands).
+        """
+        if not user_text.strip() or cls._bad_prompts.get(hash(user_text), 0) > time.monotonic():
+            yield cls.FALLBACK_REPLY
+            return
+
+        if not cls._available_models:
+            await cls.ensure_initialized()
+
+        config = cls._generation_config(0.9)
+        last_error = None
+
+        for model_name in cls._available_models:
+            text = ""
+            try:
+                async with _GEMINI_SLOTS:
+                    stream = await cls._get_model(model_name).generate_content_async(
+                        user_text, generation_config=config, stream=True
+                    )
+                    async for chunk in stream:
+                        if chunk.text:
+                            text += chunk.text
+                            yield text
+                if text:
+                    return
+
+            except InvalidArgument as e:
+                if text:
+                    logger.error("❌ Stream from %s broke off: %s", model_name, e)
+                    return
+                if cls._is_prompt_error(e):
+                    logger.warning("⚠️ Prompt rejected on %s, not retrying other models. (%s)", model_name, e)
+                    cls._remember_bad_prompt(hash(user_text))
+                    yield cls.FALLBACK_REPLY
+                    return
+                logger.warning("⚠️ Config Mismatch on %s. Skipping... (%s)", model_name, e)
+                last_error = e
+
+            except Exception as e:
+                if text:
+                    logger.error("❌ Stream from %s broke off: %s", model_name, e)
+                    return
+                logger.warning("⚠️ Stream failed on %s. Switching... (%s)", model_name, e)
+                last_error = e
+
+        logger.critical("💀 All AI models failed. Last Error: %s", last_error)
+        yield cls.FALLBACK_REPLY
+
     @classmethod
     async def summarize_news(cls, news_title: str, news_source: str):
-        """News analysis wrapper."""
+        """News analysis wrapper (cached per headline)."""
+        key = (news_title, news_source)
+        cached = cls._summary_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
         prompt = (
             f"Act as a Crypto News Editor. Analyze: '{news_title}' from '{news_source}'.\n"
             "1. If it's minor noise/spam -> Reply 'SKIP'.\n"
             "2. If important -> Summarize in 1 exciting sentence (Detect Language: Use the same language as the news title)."
         )
-        return await cls._generate_with_retry(prompt, temperature=0.5)
+        summary = await cls._generate_with_retry(prompt, temperature=0.5)
+        if summary != cls.FALLBACK_REPLY:
+            cls._summary_cache.pop(key, None)
+            if len(cls._summary_cache) >= cls.SUMMARY_CACHE_MAX:
+                del cls._summary_cache[next(iter(cls._summary_cache))]  # Oldest entry
+            cls._summary_cache[key] = (summary, time.monotonic() + cls.SUMMARY_CACHE_TTL)
+        return summary
 
     @classmethod
     async def generate_daily_digest(cls, news_list):
         """Daily Digest (English Only)."""
-        news_text = "\n".join([f"- {item['title']} (Source: {item['source']})" for item in news_list])
-        prompt = (
-            f"Role: You are TOPI, the AI crypto market analyst.\n"
-            f"Task: Write a 'Crypto Market Digest' based on these headlines:\n{news_text}\n\n"
-            "--- FORMATTING RULES ---\n"
-            "1. LANGUAGE: English ONLY (Global Standard).\n"
-            "2. TONE: Witty, energetic, use emojis.\n"
-            "3. FORMAT: Bullet points with bold headers. Keep it concise."
+        news_text = "\n".join(
+            cls.DIGEST_HEADLINE_TEMPLATE.format(title=item['title'], source=item['source'])
+            for item in news_list
         )
+        prompt = cls.DIGEST_PROMPT_TEMPLATE.format(news=news_text)
         return await cls._generate_with_retry(prompt, temperature=0.7)
 
     @classmethod
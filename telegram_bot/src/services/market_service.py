@@ -1,27 +1,32 @@
-import requests
+import aiohttp
 import logging
 
 logger = logging.getLogger(__name__)
 
 class MarketService:
-    
+    """
+    Market data (Fear & Greed, Top Gainers, Long/Short).
+    All calls use the shared application session (keep-alive, pooled connections),
+    so consecutive fetches reuse warm TCP/TLS connections.
+    """
+
     @staticmethod
-    def get_fear_and_greed():
+    async def get_fear_and_greed(session: aiohttp.ClientSession):
         """
         Fetches the Fear and Greed Index from the Alternative.me API.
         """
         url = "https://api.alternative.me/fng/?limit=1"
         try:
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            if data['data']:
-                return data['data'][0] # {value: "25", value_classification: "Extreme Fear"}
+            async with session.get(url) as response:
+                data = await response.json(content_type=None)
+                if data['data']:
+                    return data['data'][0] # {value: "25", value_classification: "Extreme Fear"}
         except Exception as e:
             logger.error(f"Fear&Greed API Error: {e}")
         return None
 
     @staticmethod
-    def get_top_gainers():
+    async def get_top_gainers(session: aiohttp.ClientSession):
         """
         Finds the top 5 gainers among the top 100 coins by market cap from CoinGecko.
         (Applies Top 100 filter to filter out junk coins)
@@ -36,18 +41,18 @@ class MarketService:
             "price_change_percentage": "24h"
         }
         try:
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                # Sort by 24h change (Descending)
-                sorted_coins = sorted(data, key=lambda x: x['price_change_percentage_24h'] if x['price_change_percentage_24h'] else 0, reverse=True)
-                return sorted_coins[:5] # Return top 5
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    # Sort by 24h change (Descending)
+                    sorted_coins = sorted(data, key=lambda x: x['price_change_percentage_24h'] if x['price_change_percentage_24h'] else 0, reverse=True)
+                    return sorted_coins[:5] # Return top 5
         except Exception as e:
             logger.error(f"CoinGecko API Error: {e}")
         return None
 
     @staticmethod
-    def get_long_short_ratio(symbol="BTCUSDT"):
+    async def get_long_short_ratio(session: aiohttp.ClientSession, symbol="BTCUSDT"):
         """
         Fetches the Global Long/Short ratio via Binance Futures.
         BTCUSDT is used as the baseline as it determines market direction.
@@ -56,14 +61,14 @@ class MarketService:
         params = {
             "symbol": symbol,
             "period": "5m", # Last 5 minutes period
-            "limit": 1
+            "limit": "1"
         }
         try:
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    return data[0] # {longAccount: "0.6", shortAccount: "0.4", longShortRatio: "1.5"}
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data:
+                        return data[0] # {longAccount: "0.6", shortAccount: "0.4", longShortRatio: "1.5"}
         except Exception as e:
             logger.error(f"Binance API Error: {e}")
-        return None
\ No newline at end of file
+        return None
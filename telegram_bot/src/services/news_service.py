@@ -1,6 +1,9 @@
+import calendar
 import feedparser
 import logging
 import random
+import time
+import functools
 import asyncio # Yeni eklendi
 from fake_useragent import UserAgent
 
@@ -28,8 +31,38 @@ class NewsService:
         """
         return feedparser.parse(url, agent=agent)
 
+    # Short-lived result cache: {limit: (task, expires_at)}
+    # Scheduled digests for many chats and /digest calls in the same minute
+    # share one RSS scan (the in-flight task itself is cached, so concurrent
+    # callers join it instead of starting their own).
+    CACHE_TTL = 60  # Seconds
+    _cache = {}
+
+    @classmethod
+    async def get_recent_news(cls, limit: int = 5) -> list:
+        """
+        Returns recent news, served from the short-lived cache while fresh.
+        """
+        now = time.monotonic()
+        cached = cls._cache.get(limit)
+        if cached and cached[1] > now:
+            task = cached[0]
+        else:
+            task = asyncio.ensure_future(cls._scan_feeds(limit))
+            task.add_done_callback(functools.partial(cls._forget_failed, limit))
+            cls._cache[limit] = (task, now + cls.CACHE_TTL)
+        return list(await asyncio.shield(task))
+
+    @classmethod
+    def _forget_failed(cls, limit: int, task: asyncio.Future):
+        """Failed scans are not cached, the next caller retries."""
+        if task.cancelled() or task.exception() is not None:
+            cached = cls._cache.get(limit)
+            if cached and cached[0] is task:
+                del cls._cache[limit]
+
     @staticmethod
-    async def get_recent_news(limit: int = 5) -> list:
+    async def _scan_feeds(limit: int) -> list:
         """
         Asynchronously scans RSS feeds.
         Prevents the bot from freezing during network requests.
@@ -62,10 +95,13 @@ class NewsService:
                 continue
 
             for entry in feed.entries[:3]:
+                published = entry.get("published_parsed")
                 all_news.append({
                     "title": entry.title,
                     "link": entry.link,
-                    "source": feed.feed.title if 'title' in feed.feed else "Crypto News"
+                    "source": feed.feed.title if 'title' in feed.feed else "Crypto News",
+                    # Unix timestamp (feedparser normalizes dates to UTC), None if the feed has none
+                    "published": calendar.timegm(published) if published else None
                 })
 
         if not all_news:
@@ -20,6 +20,10 @@ class GeminiService:
     
     # Cache to prevent fetching models on every single request
     _model_cache: List[str] = []
+
+    # Shared client: its async ('aio') surface keeps one HTTP connection pool,
+    # so TLS sessions are reused across requests instead of rebuilt per call.
+    _client: Optional[genai.Client] = None
     
     # SAFE FALLBACK: If API discovery fails entirely, default to a known stable model.
     # This ensures the bot doesn't crash even if the list endpoint is flaky.
@@ -37,6 +41,15 @@ class GeminiService:
             return float(match.group(1))
         return 0.0
 
+    @staticmethod
+    def get_client() -> genai.Client:
+        """
+        Returns the process-wide Gemini client, creating it on first use.
+        """
+        if GeminiService._client is None:
+            GeminiService._client = genai.Client(api_key=Config.GEMINI_API_KEY)
+        return GeminiService._client
+
     @staticmethod
     async def list_models(client: genai.Client) -> List[str]:
         """
@@ -119,7 +132,7 @@ class GeminiService:
             logger.error("Gemini API Key is missing.")
             return "⚠️ Error: API Key missing.", "unknown-model"
 
-        client = genai.Client(api_key=Config.GEMINI_API_KEY)
+        client = GeminiService.get_client()
         
         # 1. Select the primary model
         primary_model = await GeminiService.select_newest_model(client)